@@ -0,0 +1,102 @@
+from collections import deque
+from typing import List, Optional
+import config
+
+
+class AdaptiveQualityController:
+    """Keeps detection time within a per-frame budget by trading quality for speed
+
+    Level 0 is the detector's configured (full quality) setting. Each further
+    level applies the overrides from ``config.ADAPTIVE_LEVELS``: a factor on the
+    inference scale, a coarser HOG stride and/or running detection only on
+    every n-th frame. The controller steps down when the measured cost per
+    frame exceeds the budget. It steps back up only when the cost is well
+    below the budget and the better level is predicted to fit as well: the
+    cost ratio between neighbouring levels is measured on each transition,
+    so a 4x cheaper level does not bounce straight back up and over budget.
+    """
+
+    def __init__(self, budget_ms: float = None, levels: Optional[List[dict]] = None):
+        self.budget = (budget_ms if budget_ms is not None else config.FRAME_TIME_BUDGET_MS) / 1000.0
+        self.levels = levels if levels is not None else config.ADAPTIVE_LEVELS
+        self.samples = deque(maxlen=config.ADAPTIVE_WINDOW)
+        self.level = 0
+        self.frame_index = 0
+        self.detector = None
+        self.base = {}
+
+        # Measured cost(level k) / cost(level k + 1), keyed by k
+        self.step_ratios = {}
+        self.previous = None  # (level, cost) before the last transition
+
+    def attach(self, detector):
+        """Remember the detector's full-quality settings and apply level 0"""
+        self.detector = detector
+        self.base = {
+            'inference_scale': detector.inference_scale,
+            'hog_win_stride': tuple(detector.hog_win_stride),
+        }
+        self.set_level(0)
+
+    @property
+    def detect_every(self) -> int:
+        return self.levels[self.level].get('detect_every', 1)
+
+    def should_detect(self) -> bool:
+        """Whether the current frame should run detection (otherwise reuse results)"""
+        run = self.frame_index % self.detect_every == 0
+        self.frame_index += 1
+        return run
+
+    def record(self, detection_seconds: float) -> bool:
+        """Record one detection time, returns True if the quality level changed"""
+        self.samples.append(detection_seconds)
+        if len(self.samples) < self.samples.maxlen:
+            return False
+
+        # Frames that skip detection are free, so spread the cost over them
+        cost = sum(self.samples) / len(self.samples) / self.detect_every
+
+        # First window after a transition: learn the cost ratio of the two levels
+        if self.previous is not None:
+            previous_level, previous_cost = self.previous
+            self.previous = None
+            if cost > 0:
+                if previous_level < self.level:
+                    self.step_ratios[previous_level] = previous_cost / cost
+                else:
+                    self.step_ratios[self.level] = cost / previous_cost
+
+        degrade_limit = self.budget * config.ADAPTIVE_DEGRADE_RATIO
+        if cost > degrade_limit and self.level < len(self.levels) - 1:
+            self.previous = (self.level, cost)
+            self.set_level(self.level + 1)
+            return True
+        if cost < self.budget * config.ADAPTIVE_UPGRADE_RATIO and self.level > 0:
+            ratio = self.step_ratios.get(self.level - 1)
+            if ratio is not None and cost * ratio > degrade_limit:
+                return False
+            self.previous = (self.level, cost)
+            self.set_level(self.level - 1)
+            return True
+        return False
+
+    def set_level(self, level: int):
+        """Apply the overrides of a quality level to the attached detector"""
+        self.level = level
+        self.samples.clear()
+        if self.detector is None:
+            return
+
+        overrides = self.levels[level]
+        base_stride = self.base['hog_win_stride']
+        stride = overrides.get('hog_win_stride', base_stride)
+        self.detector.inference_scale = self.base['inference_scale'] * overrides.get('scale_factor', 1.0)
+        self.detector.hog_win_stride = (max(stride[0], base_stride[0]), max(stride[1], base_stride[1]))
+
+    def describe(self) -> str:
+        """Short human readable description of the current level"""
+        return (f"level {self.level}/{len(self.levels) - 1} "
+                f"(scale {self.detector.inference_scale:.2f}, "
+                f"stride {self.detector.hog_win_stride}, every {self.detect_every} frame(s))")
+
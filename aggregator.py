@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Count Aggregator
+================
+
+Receives the per-frame count batches published by detector hosts
+(main.py --publish udp://host:port or tcp://host:port), keeps the latest
+state of every camera and exposes the combined occupancy on the console and
+optionally as JSON over HTTP.
+
+Usage:
+    python aggregator.py --port 9500
+    python aggregator.py --port 9500 --http-port 8081   # GET /api/totals
+"""
+
+import argparse
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import config
+from count_protocol import LENGTH_PREFIX, decode_batch
+
+
+class CountAggregator:
+    """Latest count per camera, merged from any number of publisher streams"""
+
+    def __init__(self, stale_after: float = None):
+        self.stale_after = stale_after if stale_after is not None else config.AGGREGATOR_STALE_SECONDS
+        self.cameras = {}  # camera id -> state dict
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.errors = 0
+
+    def ingest(self, data: bytes):
+        """Apply one encoded batch"""
+        try:
+            camera_id, records = decode_batch(data)
+        except ValueError:
+            with self.lock:
+                self.errors += 1
+            return
+
+        now = time.time()
+        with self.lock:
+            self.batches += 1
+            state = self.cameras.setdefault(camera_id, {'frame_id': -1, 'frames': 0, 'max_count': 0})
+            for frame_id, timestamp, count, boxes in records:
+                state['frames'] += 1
+                state['max_count'] = max(state['max_count'], count)
+                # UDP may reorder batches, keep the newest frame
+                if frame_id >= state['frame_id'] or timestamp > state.get('timestamp', 0):
+                    state.update(frame_id=frame_id, timestamp=timestamp, count=count,
+                                 boxes=boxes.tolist())
+            state['received'] = now
+
+    def totals(self, now: Optional[float] = None) -> dict:
+        """Combined occupancy over cameras heard from within stale_after seconds"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            cameras = {}
+            for camera_id, state in self.cameras.items():
+                if 'count' not in state:
+                    continue
+                cameras[camera_id] = {
+                    'count': state['count'],
+                    'max_count': state['max_count'],
+                    'frames': state['frames'],
+                    'frame_id': state['frame_id'],
+                    'age': round(now - state['received'], 2),
+                    'stale': now - state['received'] > self.stale_after,
+                }
+        live = [c for c in cameras.values() if not c['stale']]
+        return {
+            'total_count': sum(c['count'] for c in live),
+            'live_cameras': len(live),
+            'cameras': cameras,
+        }
+
+
+class _UdpHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.aggregator.ingest(self.request[0])
+
+
+class _TcpHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            header = self.rfile.read(LENGTH_PREFIX.size)
+            if len(header) < LENGTH_PREFIX.size:
+                break
+            (length,) = LENGTH_PREFIX.unpack(header)
+            data = self.rfile.read(length)
+            if len(data) < length:
+                break
+            self.server.aggregator.ingest(data)
+
+
+class _UdpServer(socketserver.ThreadingUDPServer):
+    daemon_threads = True
+
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class AggregatorServer:
+    """UDP and TCP listeners (same port) feeding a CountAggregator, plus an optional HTTP endpoint"""
+
+    def __init__(self, port: int, host: str = '0.0.0.0', http_port: Optional[int] = None):
+        self.aggregator = CountAggregator()
+        self.servers = []
+        udp = _UdpServer((host, port), _UdpHandler)
+        # Port 0 picks a free port; use the same one for TCP
+        tcp = _TcpServer((host, udp.server_address[1]), _TcpHandler)
+        for server in (udp, tcp):
+            server.aggregator = self.aggregator
+            self.servers.append(server)
+
+        if http_port is not None:
+            aggregator = self.aggregator
+
+            class TotalsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?', 1)[0].rstrip('/') != '/api/totals':
+                        self.send_error(404, "Unknown endpoint")
+                        return
+                    data = json.dumps(aggregator.totals()).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+
+                def log_message(self, format, *args):
+                    pass
+
+            http_server = ThreadingHTTPServer((host, http_port), TotalsHandler)
+            http_server.daemon_threads = True
+            self.servers.append(http_server)
+
+    @property
+    def port(self) -> int:
+        return self.servers[0].server_address[1]
+
+    def start(self):
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate person counts published by detector hosts')
+    parser.add_argument('--port', '-p', type=int, default=config.AGGREGATOR_PORT,
+                        help=f'UDP and TCP port to receive counts on (default: {config.AGGREGATOR_PORT})')
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to listen on')
+    parser.add_argument('--http-port', type=int, default=None,
+                        help='Serve the totals as JSON at /api/totals on this port')
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help='Seconds between console summaries')
+    args = parser.parse_args()
+
+    server = AggregatorServer(args.port, args.host, args.http_port)
+    server.start()
+    print("📡 Count Aggregator")
+    print("=" * 40)
+    print(f"Listening on udp/tcp {args.host}:{args.port}")
+    if args.http_port is not None:
+        print(f"🌐 Totals at http://{args.host}:{args.http_port}/api/totals")
+
+    try:
+        while True:
+            time.sleep(args.interval)
+            totals = server.aggregator.totals()
+            print(f"👥 Total: {totals['total_count']} across {totals['live_cameras']} live camera(s)")
+            for camera_id, state in sorted(totals['cameras'].items()):
+                flag = " (stale)" if state['stale'] else ""
+                print(f"   {camera_id}: {state['count']}{flag}")
+    except KeyboardInterrupt:
+        print("\n⏹️ Aggregator stopped")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import config
+
+
+class SnapshotCache:
+    """Latest detector state shared by all API clients
+
+    The detection loop only calls publish(), which stores a reference and
+    bumps a version number. Payloads are built and JSON encoded lazily, at
+    most once per published frame, by whichever request needs them first;
+    every other client is served the cached bytes, so the number of clients
+    does not add work to the detection loop.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.detector = None
+        self.version = 0
+        self.encoded = {}  # payload name -> (version, bytes)
+        self.build_lock = threading.Lock()
+
+    def publish(self, detector):
+        """Mark a new frame as available (called once per frame by the detection loop)"""
+        with self.condition:
+            self.detector = detector
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait_for_update(self, version: int, timeout: float) -> int:
+        """Block until a version newer than `version` is published or the timeout expires"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    def get(self, name: str) -> bytes:
+        """Encoded payload ('count', 'stats', 'detections' or 'snapshot') for the latest frame"""
+        version = self.version
+        cached = self.encoded.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self.build_lock:
+            cached = self.encoded.get(name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            data = json.dumps(self.build(name)).encode('utf-8')
+            self.encoded[name] = (version, data)
+            return data
+
+    def build(self, name: str) -> dict:
+        detector = self.detector
+        result = detector.last_frame_result if detector is not None else None
+        if result is None:
+            payload = {'frame_id': 0, 'timestamp': None, 'count': 0}
+        else:
+            payload = {'frame_id': result.frame_id, 'timestamp': result.timestamp, 'count': len(result)}
+        if name == 'count' or detector is None:
+            return payload
+
+        if name in ('stats', 'snapshot'):
+            payload['method'] = detector.method
+            payload['stats'] = detector.get_current_stats()
+        if name in ('detections', 'snapshot') and result is not None:
+            recent = detector.get_history_since(result.frame_id - config.API_RECENT_DETECTIONS)
+            payload['detections'] = [entry.to_dict() for entry in recent]
+        return payload
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    cache: SnapshotCache = None
+    routes = {
+        '/api/count': 'count',
+        '/api/stats': 'stats',
+        '/api/detections': 'detections',
+        '/api/snapshot': 'snapshot',
+    }
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path in self.routes:
+            self.send_payload(self.cache.get(self.routes[path]))
+        elif path == '/api/events':
+            self.stream_events()
+        else:
+            self.send_error(404, "Unknown endpoint")
+
+    def send_payload(self, data: bytes):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def stream_events(self):
+        """Server-sent events: the stats payload, at most every API_SSE_INTERVAL seconds"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+        version = 0
+        try:
+            while True:
+                new_version = self.cache.wait_for_update(version, config.API_SSE_KEEPALIVE)
+                if new_version == version:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    version = new_version
+                    self.wfile.write(b"event: stats\ndata: " + self.cache.get('stats') + b"\n\n")
+                self.wfile.flush()
+                time.sleep(config.API_SSE_INTERVAL)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass  # Keep the console for detection output
+
+
+class ApiServer:
+    """Embedded HTTP API serving counts and statistics from a SnapshotCache
+
+    Endpoints: /api/count, /api/stats, /api/detections, /api/snapshot (JSON)
+    and /api/events (server-sent events).
+    """
+
+    def __init__(self, port: Optional[int] = None, host: Optional[str] = None):
+        self.port = port or config.API_PORT
+        self.host = host or config.API_HOST
+        self.cache = SnapshotCache()
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        handler = type('ApiHandler', (_ApiHandler,), {'cache': self.cache})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"🌐 API listening on http://{self.host}:{self.server.server_address[1]}/api/stats")
+
+    def publish(self, detector):
+        self.cache.publish(detector)
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            print("✓ API stopped")
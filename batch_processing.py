@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Batch Person Counting
+=====================
+
+Counts persons in every image of a directory tree using a process pool and
+streams the results to a CSV or JSON Lines file. Completed images are
+recorded in a manifest next to the output, so an interrupted run resumes
+where it stopped when started again with the same arguments.
+
+Usage:
+    python batch_processing.py photos/ --output counts.csv
+    python batch_processing.py photos/ --output counts.jsonl --workers 8 --method YOLO
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import time
+import cv2
+from multiprocessing.pool import ThreadPool
+from typing import List, Optional, Tuple
+import config
+from detector_backends import backend_names, get_backend
+from frame_sources import list_images
+from person_detection import PersonDetector
+
+_detector = None
+
+
+def _init_worker(method: str, single_threaded: bool = True):
+    """Create the detector used by this worker process (or shared by all threads)"""
+    global _detector
+    if single_threaded:
+        cv2.setNumThreads(1)  # One image per core, avoid oversubscription
+    _detector = PersonDetector(method=method)
+
+
+def _process_images(task: Tuple[str, List[str]]) -> List[dict]:
+    """Detect persons in a group of images (one detector call if the backend batches)"""
+    root, relative_paths = task
+    start = time.perf_counter()
+    rows, frames = [], []
+    for relative_path in relative_paths:
+        frame = cv2.imread(os.path.join(root, relative_path))
+        if frame is None:
+            rows.append({'image': relative_path, 'count': None, 'boxes': [], 'error': 'unreadable'})
+        else:
+            frames.append((relative_path, frame))
+
+    results = _detector.detect_boxes_batch([frame for _, frame in frames]) if frames else []
+    ms = round((time.perf_counter() - start) * 1000 / len(relative_paths), 1)
+    for (relative_path, _), result in zip(frames, results):
+        rows.append({
+            'image': relative_path,
+            'count': len(result),
+            'boxes': result.boxes.round().astype(int).tolist(),
+            'ms': ms,
+            'error': None,
+        })
+    return rows
+
+
+def load_manifest(path: str) -> set:
+    """Relative paths of images already processed"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+def run_batch(root: str, output: str, method: str, workers: Optional[int] = None,
+              chunk_size: int = None) -> int:
+    """Process all pending images below root, returns the number processed in this run"""
+    manifest_path = output + '.manifest'
+    done = load_manifest(manifest_path)
+    images = [os.path.relpath(p, root) for p in list_images(root)]
+    pending = [p for p in images if p not in done]
+    print(f"📂 {len(images)} images, {len(done)} already done, {len(pending)} to process")
+    if not pending:
+        return 0
+
+    as_csv = output.lower().endswith('.csv')
+    write_header = as_csv and not os.path.exists(output)
+
+    # Backend capabilities decide batching, worker count and threads vs processes
+    backend = get_backend(method)
+    workers = workers or backend.recommended_workers()
+    batch_size = backend.batch_size if backend.supports_batch else 1
+    chunk_size = max(1, (chunk_size or config.BATCH_CHUNK_SIZE) // batch_size)
+    if backend.thread_safe:
+        # One shared detector, no per-process model load
+        _init_worker(method, single_threaded=False)
+        pool = ThreadPool(workers)
+    else:
+        pool = mp.get_context('spawn').Pool(workers, initializer=_init_worker, initargs=(method,))
+    print(f"⚙️ {backend.name}: {workers} {'thread' if backend.thread_safe else 'process'}(es), "
+          f"{batch_size} image(s) per call")
+
+    processed = 0
+    start = time.time()
+    with open(output, 'a', newline='', encoding='utf-8') as out, \
+            open(manifest_path, 'a', encoding='utf-8') as manifest, pool:
+        writer = csv.writer(out) if as_csv else None
+        if write_header:
+            writer.writerow(['image', 'count', 'boxes', 'error'])
+
+        tasks = ((root, pending[i:i + batch_size]) for i in range(0, len(pending), batch_size))
+        for rows in pool.imap_unordered(_process_images, tasks, chunksize=chunk_size):
+            for result in rows:
+                if as_csv:
+                    writer.writerow([result['image'], result['count'],
+                                     json.dumps(result['boxes']), result['error'] or ''])
+                else:
+                    out.write(json.dumps(result) + '\n')
+                manifest.write(result['image'] + '\n')
+
+                processed += 1
+                if processed % config.BATCH_FLUSH_EVERY == 0:
+                    # Results reach disk before the manifest marks them done
+                    out.flush()
+                    manifest.flush()
+                    rate = processed / max(time.time() - start, 1e-6)
+                    print(f"⏳ {processed}/{len(pending)} ({rate:.1f} images/s)")
+
+    elapsed = time.time() - start
+    print(f"✅ Processed {processed} images in {elapsed:.1f}s ({processed / max(elapsed, 1e-6):.1f} images/s)")
+    return processed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Count persons in a directory of images')
+    parser.add_argument('directory', help='Root directory of the images')
+    parser.add_argument('--output', '-o', required=True,
+                        help='Results file (.csv or .jsonl); a .manifest file is kept next to it')
+    parser.add_argument('--method', choices=backend_names(), default=config.DETECTION_METHOD,
+                        help=f'Detection method (default: {config.DETECTION_METHOD})')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Worker processes (default: chosen from the detection backend)')
+    parser.add_argument('--chunk-size', type=int, default=config.BATCH_CHUNK_SIZE,
+                        help=f'Images sent to a worker at a time (default: {config.BATCH_CHUNK_SIZE})')
+    args = parser.parse_args(argv)
+
+    print("🗂️  Batch Person Counting")
+    print("=" * 40)
+    try:
+        run_batch(args.directory, args.output, args.method, args.workers, args.chunk_size)
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrupted - run again with the same arguments to resume")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from collections import OrderedDict
+import numpy as np
+from typing import Tuple
+import config
+
+
+class BufferPool:
+    """Reusable image buffers keyed by purpose, shape and dtype
+
+    Each key owns a small ring of preallocated arrays that ``get()`` hands
+    out in turn, so steady-state frame processing writes into existing
+    memory (e.g. via OpenCV ``dst=``) instead of allocating. A buffer is
+    reused after ``depth`` further calls with the same key, so consumers
+    must not keep a frame longer than that. Rarely used keys are evicted
+    once more than ``max_keys`` exist.
+    """
+
+    def __init__(self, depth: int = None, max_keys: int = None):
+        self.depth = depth or config.BUFFER_POOL_DEPTH
+        self.max_keys = max_keys or config.BUFFER_POOL_MAX_KEYS
+        self.rings = OrderedDict()
+
+    def get(self, tag: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Return the next buffer of the ring for (tag, shape, dtype)"""
+        key = (tag, tuple(shape), np.dtype(dtype).str)
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = [[np.empty(shape, dtype=dtype) for _ in range(self.depth)], 0]
+            self.rings[key] = ring
+            if len(self.rings) > self.max_keys:
+                self.rings.popitem(last=False)
+        else:
+            self.rings.move_to_end(key)
+
+        buffers, index = ring
+        ring[1] = (index + 1) % len(buffers)
+        return buffers[index]
+
+    def clear(self):
+        self.rings.clear()
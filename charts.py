@@ -0,0 +1,93 @@
+import tkinter as tk
+import numpy as np
+from typing import Optional, Tuple
+import config
+
+
+class TimeSeries:
+    """Fixed-capacity ring of (time, value) samples"""
+
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity or config.CHART_MAX_SAMPLES
+        self.times = np.zeros(self.capacity, dtype=np.float64)
+        self.values = np.zeros(self.capacity, dtype=np.float64)
+        self.total = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, timestamp: float, value: float):
+        i = self.total % self.capacity
+        self.times[i] = timestamp
+        self.values[i] = value
+        self.total += 1
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples in chronological order"""
+        if self.total <= self.capacity:
+            return self.times[:self.total], self.values[:self.total]
+        start = self.total % self.capacity
+        return (np.concatenate([self.times[start:], self.times[:start]]),
+                np.concatenate([self.values[start:], self.values[:start]]))
+
+    def clear(self):
+        self.total = 0
+
+
+def decimate_minmax(times: np.ndarray, values: np.ndarray, columns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a series to the min and max of each of `columns` equal time bins
+
+    Returns at most 2 * columns points, so short peaks and dips stay visible
+    however many samples are plotted.
+    """
+    if len(times) <= 2 * columns:
+        return times, values
+
+    edges = np.linspace(times[0], times[-1], columns + 1)[:-1]
+    starts = np.unique(np.searchsorted(times, edges))
+    lows = np.minimum.reduceat(values, starts)
+    highs = np.maximum.reduceat(values, starts)
+    return np.repeat(times[starts], 2), np.column_stack([lows, highs]).ravel()
+
+
+class LiveChart:
+    """Line chart of a TimeSeries drawn on a Tk Canvas
+
+    The canvas items are created once and only their coordinates and text
+    are updated on each redraw.
+    """
+
+    PAD = 4
+
+    def __init__(self, parent, title: str, color: str, unit: str = '', min_range: float = 1.0,
+                 width: int = 200, height: int = 90):
+        self.title = title
+        self.unit = unit
+        self.min_range = min_range
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg='#2c3e50', highlightthickness=0)
+        self.line = self.canvas.create_line(0, 0, 0, 0, fill=color, width=1, state=tk.HIDDEN)
+        self.label = self.canvas.create_text(self.PAD, self.PAD, anchor='nw', fill='white',
+                                             font=('Arial', 8), text=f"{title}: --")
+
+    def draw(self, series: TimeSeries, span: Optional[float] = None):
+        """Redraw the chart with the whole series (or its last `span` seconds)"""
+        times, values = series.arrays()
+        if span is not None and len(times):
+            keep = np.searchsorted(times, times[-1] - span)
+            times, values = times[keep:], values[keep:]
+        if len(times) < 2 or times[-1] <= times[0]:
+            self.canvas.itemconfigure(self.line, state=tk.HIDDEN)
+            return
+
+        width = max(self.canvas.winfo_width(), 2 * self.PAD + 2)
+        height = max(self.canvas.winfo_height(), 2 * self.PAD + 2)
+        columns = min(config.CHART_MAX_POINTS // 2, width - 2 * self.PAD)
+        plot_times, plot_values = decimate_minmax(times, values, columns)
+
+        top = max(float(values.max()), self.min_range)
+        x = self.PAD + (plot_times - times[0]) / (times[-1] - times[0]) * (width - 2 * self.PAD)
+        y = height - self.PAD - plot_values / top * (height - 2 * self.PAD - 12)
+        self.canvas.coords(self.line, *np.column_stack([x, y]).ravel().tolist())
+        self.canvas.itemconfigure(self.line, state=tk.NORMAL)
+        self.canvas.itemconfigure(
+            self.label, text=f"{self.title}: {values[-1]:.1f}{self.unit} (max {values.max():.1f})")
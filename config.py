@@ -1,7 +1,7 @@
 # Configuration file for person detection project
 
 # Detection methods
-DETECTION_METHOD = "HOG"  # Options: "HOG", "YOLO"
+DETECTION_METHOD = "HOG"  # Options: "HOG", "YOLO", "CASCADE" (see detector_backends.py)
 
 # Display settings
 WINDOW_WIDTH = 1200
@@ -13,12 +13,92 @@ CAMERA_HEIGHT = 480
 BBOX_COLOR = (0, 255, 0)  # Green
 TEXT_COLOR = (0, 0, 255)  # Red
 TIME_COLOR = (255, 255, 255)  # White
+LINE_COLOR = (255, 255, 0)  # Cyan
 
 # Detection parameters
 HOG_WIN_STRIDE = (8, 8)
 HOG_PADDING = (16, 16)
 HOG_SCALE = 1.05
 
+# YOLO: frames larger than the model input are downscaled before inference
+YOLO_INPUT_SIZE = 640
+YOLO_BATCH_SIZE = 8  # Images per YOLO call in batch processing
+
+# Cascade detection: cheap proposals refined by YOLO on padded crops
+CASCADE_PROPOSER = "HOG"  # Options: "HOG", "MOTION"
+CASCADE_CROP_PADDING = 0.25  # Padding around each proposal, fraction of its size
+CASCADE_FULL_FRAME_INTERVAL = 15  # Full-frame YOLO pass every N frames
+CASCADE_MIN_CROP = 32  # Skip crops smaller than this (pixels)
+CASCADE_MIN_MOTION_AREA = 500  # Minimum moving blob area for MOTION proposals
+
+# Fraction of the camera resolution used for inference (1.0 = full size)
+INFERENCE_SCALE = 1.0
+
+# Optional tuned profile (JSON written by tuning.py), applied at startup
+CONFIG_PROFILE = None
+
+# Person tracking (stable IDs and unique visitor counts)
+TRACKING_ENABLED = True
+TRACK_IOU_THRESHOLD = 0.3  # Minimum IoU to continue a track
+TRACK_MAX_AGE = 15  # Frames a track survives without a detection
+TRACK_MIN_HITS = 3  # Detections before a track counts as a unique person
+
+# Virtual counting lines, e.g.
+# [{'name': 'door', 'start': (320, 0), 'end': (320, 480), 'invert': False}]
+# For a line drawn top to bottom, moving left to right counts as "in"
+COUNTING_LINES = []
+COUNTING_MAX_DISTANCE = 80  # Max centroid movement between frames (pixels)
+
+# Occupancy heatmap
+HEATMAP_ENABLED = False
+HEATMAP_CELL_SIZE = 8  # Pixels per grid cell
+HEATMAP_DECAY = 0.999  # Per-frame decay (~23 s half-life at 30 FPS)
+HEATMAP_FOOTPRINT = 0.25  # Lower fraction of each box that counts as floor contact
+HEATMAP_EXPORT_INTERVAL = 60  # Seconds between heatmap.png / heatmap.npy writes
+HEATMAP_OUTPUT_DIR = "heatmaps"
+
+# Static-scene cache: reuse detections while the frame hash barely changes
+STATIC_CACHE_ENABLED = False
+STATIC_CACHE_THRESHOLD = 4  # Max differing bits of the 64-bit frame hash
+STATIC_CACHE_MAX_AGE = 30  # Max frames a cached result is reused
+
+# Batch processing of image folders (see batch_processing.py)
+BATCH_CHUNK_SIZE = 16  # Images handed to a worker at a time
+BATCH_FLUSH_EVERY = 100  # Results between output/manifest flushes
+
+# Preallocated frame buffers (see buffers.py)
+BUFFER_POOL_DEPTH = 3  # Frames a consumer may hold before its buffer is reused
+BUFFER_POOL_MAX_KEYS = 16
+
+# Multi-process detection (1 = detect in the main process)
+DETECTION_WORKERS = 1
+SHARED_MEMORY_SLOTS = 4  # Frames in flight, at least workers + 1
+WORKER_RESULT_TIMEOUT = 30.0  # Seconds without a result before falling back to in-process detection
+WORKER_POLL_INTERVAL = 0.5  # Seconds between worker liveness checks while waiting
+
+# Adaptive quality: degrade gracefully when detection exceeds the frame budget
+ADAPTIVE_QUALITY = False
+FRAME_TIME_BUDGET_MS = 33.0  # ~30 FPS
+ADAPTIVE_WINDOW = 15  # Detections averaged before each decision
+ADAPTIVE_DEGRADE_RATIO = 1.0  # Step down when cost > budget * ratio
+ADAPTIVE_UPGRADE_RATIO = 0.6  # Step up when cost < budget * ratio
+ADAPTIVE_LEVELS = [
+    {},
+    {'scale_factor': 0.75},
+    {'scale_factor': 0.75, 'hog_win_stride': (16, 16)},
+    {'scale_factor': 0.5, 'hog_win_stride': (16, 16)},
+    {'scale_factor': 0.5, 'hog_win_stride': (16, 16), 'detect_every': 2},
+    {'scale_factor': 0.5, 'hog_win_stride': (16, 16), 'detect_every': 3},
+]
+
+# Auto-tuner search space (see tuning.py)
+TUNE_WIN_STRIDES = [(4, 4), (8, 8), (12, 12), (16, 16)]
+TUNE_PADDINGS = [(0, 0), (8, 8), (16, 16)]
+TUNE_HOG_SCALES = [1.03, 1.05, 1.1, 1.2]
+TUNE_INFERENCE_SCALES = [0.5, 0.75, 1.0]
+TUNE_IOU_THRESHOLD = 0.5
+TUNE_MIN_RECALL = 0.6
+
 # Text settings
 FONT = 0
 FONT_SCALE = 0.7
@@ -26,3 +106,98 @@ FONT_THICKNESS = 2
 
 # Camera settings
 CAMERA_INDEX = 0  # 0 for default camera
+CAMERA_FPS = 30
+
+# Frame source: None uses CAMERA_INDEX, otherwise a device index, video file,
+# image folder or stream URL (rtsp://, http://, ...)
+CAMERA_SOURCE = None
+CAPTURE_BACKEND = "ANY"  # Options: "ANY", "V4L2", "FFMPEG", "GSTREAMER", "DSHOW", "MSMF"
+THREADED_CAPTURE = True  # Decode frames on a background thread
+CAPTURE_QUEUE_SIZE = 8  # Decoded frames buffered for files and folders
+CAPTURE_READ_TIMEOUT = 5.0  # Seconds to wait for a frame before giving up
+CAPTURE_BUFFER_SIZE = 1  # Frames queued in the camera driver (1 = always the newest)
+CAPTURE_RETRY_DELAY = 0.1  # First backoff (s) after a failed live read, doubled per failure
+CAPTURE_RETRY_MAX_DELAY = 5.0  # Longest backoff between retries
+CAPTURE_REOPEN_AFTER = 3  # Reopen cameras and streams after this many consecutive failed reads
+CAMERA_KEEP_WARM = True  # Stop only pauses a camera device, so Start resumes instantly
+
+# Camera format probing: the smallest size >= CAMERA_WIDTH x CAMERA_HEIGHT and the
+# first format in CAMERA_FORMATS (cheapest to decode first) that reaches CAMERA_FPS
+CAMERA_PROBE_FORMATS = True
+CAMERA_FORMATS = ["YUYV", "MJPG"]  # YUYV needs no JPEG decoding, MJPG needs less USB bandwidth
+CAMERA_PROBE_RESOLUTIONS = [(640, 480), (800, 600), (1280, 720), (1920, 1080)]
+
+# Detection results kept in memory for the history panel
+HISTORY_LENGTH = 2000
+HISTORY_DISPLAY_LINES = 500  # Lines kept in the GUI history panel (one per count change)
+
+# GUI live charts (sampled on every GUI refresh, i.e. 10 times per second)
+CHART_MAX_SAMPLES = 144000  # 4 hours of samples per chart
+CHART_MAX_POINTS = 400  # Points drawn per chart after min/max decimation
+CHART_REFRESH_MS = 1000
+
+# Rolling statistics: window name -> (duration in seconds, buckets). The buckets
+# are also the downsampled time series kept for each window
+STATS_WINDOWS = {
+    '1m': (60, 60),        # 1 s buckets
+    '15m': (900, 90),      # 10 s buckets
+    '1h': (3600, 60),      # 1 min buckets
+    '1d': (86400, 96),     # 15 min buckets
+}
+STATS_DISPLAY_WINDOW = '15m'  # Window behind the GUI average and maximum
+STATS_MAX_COUNT = 100  # Counts above this share the top histogram bin
+STATS_MAX_GAP = 1.0  # Longest time (s) one frame's count is assumed to hold
+
+# HTTP API (api_server.py): None disables it
+API_PORT = None
+API_HOST = "127.0.0.1"  # Use "0.0.0.0" to serve other machines
+API_RECENT_DETECTIONS = 10  # Frames returned by /api/detections
+API_SSE_INTERVAL = 0.2  # Minimum seconds between server-sent events per client
+API_SSE_KEEPALIVE = 15.0  # Seconds without a new frame before a keepalive comment
+
+# Count publishing to an aggregator (count_protocol.py, aggregator.py)
+PUBLISH_TARGET = None  # "udp://host:port" or "tcp://host:port", None disables it
+CAMERA_ID = None  # Name sent with the counts (default: host name)
+PUBLISH_BOXES = True  # Send boxes as well as counts
+PUBLISH_BATCH_FRAMES = 10  # Frames per batch
+PUBLISH_BATCH_INTERVAL = 0.5  # Maximum seconds a frame waits in a batch
+PUBLISH_MAX_DATAGRAM = 1200  # UDP batch size limit in bytes (below a typical MTU)
+PUBLISH_TIMEOUT = 0.5  # Socket timeout in seconds
+PUBLISH_RECONNECT_DELAY = 1.0  # Seconds without connect attempts after a failed send, doubled per failure
+PUBLISH_RECONNECT_MAX_DELAY = 30.0
+AGGREGATOR_PORT = 9500
+AGGREGATOR_STALE_SECONDS = 5.0  # Cameras silent for longer are left out of the total
+
+# Profiling (main.py --profile): stack sampling interval and event limit
+PROFILE_SAMPLE_MS = 0  # 0 records spans only
+PROFILE_MAX_EVENTS = 1000000
+
+# Capture-to-display latency percentiles are computed over this many frames
+LATENCY_WINDOW = 300
+
+# Raw capture recording (replay with --source replay://<file>[?fast][&loop])
+RECORD_PATH = None  # Record every captured frame to this file
+RECORD_MAX_FRAMES = 1800  # Recording capacity (1 minute at 30 FPS)
+
+# Synthetic test source (--source "synthetic://[easy|medium|hard][?size=WxH&fps=&seed=&people=&fast&loop]")
+SYNTHETIC_SIZE = (1280, 720)
+SYNTHETIC_FPS = 30
+SYNTHETIC_SEED = 0
+SYNTHETIC_DIFFICULTY = 'medium'
+SYNTHETIC_PRESETS = {
+    # people, sensor noise sigma, lighting drift amplitude, figure height (fraction of frame), speed (px/s at 1280 wide)
+    'easy': {'people': 2, 'noise': 2.0, 'lighting': 0.0, 'scale': (0.5, 0.65), 'speed': (30, 70)},
+    'medium': {'people': 5, 'noise': 6.0, 'lighting': 0.15, 'scale': (0.35, 0.6), 'speed': (40, 120)},
+    'hard': {'people': 12, 'noise': 12.0, 'lighting': 0.35, 'scale': (0.2, 0.5), 'speed': (60, 200)},
+}
+SYNTHETIC_EVAL_FRAMES = 300  # Frames evaluation.py labels for a synthetic dataset without --max-frames
+
+# Soak testing (soak.py): memory growth limits after warm-up
+SOAK_FRAMES = 100000
+SOAK_WARMUP_FRAMES = 3000  # History (HISTORY_LENGTH) and other bounded buffers fill up first
+SOAK_SAMPLE_FRAMES = 5000  # Frames between memory samples
+SOAK_SIMULATED_FPS = 30  # Detections are stamped at this rate, 0 uses capture time
+SOAK_MAX_RSS_GROWTH_MB = 50
+SOAK_MAX_TRACED_GROWTH_MB = 10
+SOAK_TOP_ALLOCATORS = 5  # Allocation sites listed per sample
+SOAK_TRACE_FRAMES = 1  # Stack frames tracemalloc keeps per allocation
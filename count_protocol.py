@@ -0,0 +1,162 @@
+import socket
+import struct
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+import config
+from detection_result import DetectionResult
+
+# Wire format (little endian). A batch is
+#   magic "PC", version (uint8), camera id length (uint8), camera id (utf-8),
+#   record count (uint16)
+# followed by one record per frame
+#   frame id (uint32), capture timestamp (float64), person count (uint16),
+#   box count (uint16), then box count x (x1, y1, x2, y2) as uint16 pixels.
+# Over UDP each datagram is one batch; over TCP each batch is prefixed with
+# its length as uint32. A frame without boxes costs 16 bytes.
+MAGIC = b'PC'
+VERSION = 1
+BATCH_HEADER = struct.Struct('<2sBB')
+RECORD_COUNT = struct.Struct('<H')
+RECORD = struct.Struct('<IdHH')
+LENGTH_PREFIX = struct.Struct('<I')
+
+Record = Tuple[int, float, int, np.ndarray]  # frame id, timestamp, count, (N, 4) uint16 boxes
+
+
+def encode_record(result: DetectionResult, include_boxes: bool = True) -> bytes:
+    """One frame's count (and optionally boxes) in wire format"""
+    boxes = np.clip(np.round(result.boxes), 0, 65535).astype('<u2') if include_boxes else None
+    count = min(len(result), 65535)
+    num_boxes = 0 if boxes is None else min(len(boxes), 65535)
+    data = RECORD.pack(result.frame_id & 0xFFFFFFFF, result.timestamp, count, num_boxes)
+    if num_boxes:
+        data += boxes[:num_boxes].tobytes()
+    return data
+
+
+def encode_batch(camera_id: str, records: List[bytes]) -> bytes:
+    name = camera_id.encode('utf-8')[:255]
+    return (BATCH_HEADER.pack(MAGIC, VERSION, len(name)) + name
+            + RECORD_COUNT.pack(len(records)) + b''.join(records))
+
+
+def decode_batch(data: bytes) -> Tuple[str, List[Record]]:
+    """Parse one batch, raises ValueError on malformed input"""
+    try:
+        magic, version, name_length = BATCH_HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a count batch")
+        offset = BATCH_HEADER.size
+        camera_id = data[offset:offset + name_length].decode('utf-8', errors='replace')
+        offset += name_length
+        (num_records,) = RECORD_COUNT.unpack_from(data, offset)
+        offset += RECORD_COUNT.size
+
+        records = []
+        for _ in range(num_records):
+            frame_id, timestamp, count, num_boxes = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            boxes = np.frombuffer(data, dtype='<u2', count=num_boxes * 4, offset=offset).reshape(-1, 4)
+            offset += num_boxes * 8
+            records.append((frame_id, timestamp, count, boxes))
+    except struct.error as e:
+        raise ValueError(f"Truncated count batch: {e}")
+    return camera_id, records
+
+
+def parse_target(target: str) -> Tuple[str, str, int]:
+    """"udp://host:port" or "tcp://host:port" to (protocol, host, port)"""
+    protocol, _, address = target.partition('://')
+    host, _, port = address.rpartition(':')
+    if protocol.lower() not in ('udp', 'tcp') or not host or not port.isdigit():
+        raise ValueError(f"Invalid publish target {target!r}, expected udp://host:port or tcp://host:port")
+    return protocol.lower(), host, int(port)
+
+
+class CountPublisher:
+    """Sends per-frame counts and boxes of one camera to an aggregator
+
+    Records are batched and sent when PUBLISH_BATCH_FRAMES frames are
+    pending, PUBLISH_BATCH_INTERVAL seconds have passed since the first of
+    them, or (over UDP) the batch would exceed PUBLISH_MAX_DATAGRAM bytes.
+    Sending never blocks detection for long: a failed send drops the batch,
+    and no reconnect is attempted for PUBLISH_RECONNECT_DELAY seconds
+    (doubling per failure up to PUBLISH_RECONNECT_MAX_DELAY). Batches due
+    in that time are dropped without touching the network.
+    """
+
+    def __init__(self, target: str = None, camera_id: Optional[str] = None, include_boxes: bool = None):
+        self.protocol, self.host, self.port = parse_target(target or config.PUBLISH_TARGET)
+        self.camera_id = camera_id or config.CAMERA_ID or socket.gethostname()
+        self.include_boxes = config.PUBLISH_BOXES if include_boxes is None else include_boxes
+        self.records: List[bytes] = []
+        self.pending_bytes = 0
+        self.first_pending = None
+        self.sock = None
+        self.sent_batches = 0
+        self.dropped_batches = 0
+        self.failures = 0  # Consecutive failed sends
+        self.retry_at = 0.0  # No connect attempt before this time
+
+    def connect(self):
+        if self.protocol == 'udp':
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.connect((self.host, self.port))
+        else:
+            self.sock = socket.create_connection((self.host, self.port), timeout=config.PUBLISH_TIMEOUT)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(config.PUBLISH_TIMEOUT)
+
+    def publish(self, result: DetectionResult):
+        """Queue one frame's detections, sending the batch when it is due"""
+        record = encode_record(result, self.include_boxes)
+        if (self.protocol == 'udp' and self.records
+                and self.pending_bytes + len(record) > config.PUBLISH_MAX_DATAGRAM):
+            self.flush()
+
+        if not self.records:
+            self.first_pending = time.time()
+        self.records.append(record)
+        self.pending_bytes += len(record)
+
+        if (len(self.records) >= config.PUBLISH_BATCH_FRAMES
+                or time.time() - self.first_pending >= config.PUBLISH_BATCH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        """Send pending records now"""
+        if not self.records:
+            return
+        batch = encode_batch(self.camera_id, self.records)
+        self.records = []
+        self.pending_bytes = 0
+        if self.sock is None and time.monotonic() < self.retry_at:
+            self.dropped_batches += 1
+            return
+        try:
+            if self.sock is None:
+                self.connect()
+            if self.protocol == 'udp':
+                self.sock.send(batch)
+            else:
+                self.sock.sendall(LENGTH_PREFIX.pack(len(batch)) + batch)
+            self.sent_batches += 1
+            self.failures = 0
+        except OSError as e:
+            if not self.dropped_batches:
+                print(f"⚠ Count publishing to {self.host}:{self.port} failed: {e}")
+            self.dropped_batches += 1
+            self.failures += 1
+            delay = min(config.PUBLISH_RECONNECT_DELAY * 2 ** (self.failures - 1), config.PUBLISH_RECONNECT_MAX_DELAY)
+            self.retry_at = time.monotonic() + delay
+            self.close_socket()
+
+    def close_socket(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def close(self):
+        self.flush()
+        self.close_socket()
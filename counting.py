@@ -0,0 +1,96 @@
+from typing import Dict, List, Tuple
+import config
+
+
+class CountingLine:
+    """A virtual line counting crossings in each direction
+
+    Crossing towards the left-hand side of the direction start -> end, as
+    seen on screen, counts as "in": for a line drawn top to bottom that is
+    moving left to right. Set invert to swap the directions.
+    """
+
+    def __init__(self, name: str, start: Tuple[float, float], end: Tuple[float, float],
+                 invert: bool = False):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.invert = invert
+        self.count_in = 0
+        self.count_out = 0
+
+    def side(self, point: Tuple[float, float]) -> float:
+        """Signed side of a point relative to the line (cross product)"""
+        (x1, y1), (x2, y2) = self.start, self.end
+        return (x2 - x1) * (point[1] - y1) - (y2 - y1) * (point[0] - x1)
+
+    def check(self, previous: Tuple[float, float], current: Tuple[float, float]):
+        """Count a movement from previous to current if it crosses the line segment"""
+        before, after = self.side(previous), self.side(current)
+        # Points exactly on the line belong to the non-negative side
+        if (before >= 0) == (after >= 0):
+            return
+
+        # The movement must also cross within the segment's extent
+        (x1, y1), (x2, y2) = self.start, self.end
+        d_start = (current[0] - previous[0]) * (y1 - previous[1]) - (current[1] - previous[1]) * (x1 - previous[0])
+        d_end = (current[0] - previous[0]) * (y2 - previous[1]) - (current[1] - previous[1]) * (x2 - previous[0])
+        if (d_start > 0) == (d_end > 0) and d_start != 0 and d_end != 0:
+            return
+
+        entering = (after < 0) != self.invert
+        if entering:
+            self.count_in += 1
+        else:
+            self.count_out += 1
+
+
+class LineCrossingCounter:
+    """Counts people crossing virtual lines using centroid association between frames
+
+    Previous centroids are bucketed in a grid with cell size equal to the
+    maximum match distance, so each detection only inspects the 3x3 cells
+    around it: constant work per detection and per line.
+    """
+
+    def __init__(self, lines: List[dict] = None, max_distance: float = None):
+        lines = lines if lines is not None else config.COUNTING_LINES
+        self.lines = [CountingLine(l['name'], tuple(l['start']), tuple(l['end']), l.get('invert', False))
+                      for l in lines]
+        self.max_distance = max_distance if max_distance is not None else config.COUNTING_MAX_DISTANCE
+        self.grid = {}
+
+    def _cell(self, point: Tuple[float, float]) -> Tuple[int, int]:
+        return int(point[0] // self.max_distance), int(point[1] // self.max_distance)
+
+    def update(self, boxes: List):
+        """Associate this frame's centroids with the previous frame's and count crossings"""
+        limit = self.max_distance ** 2
+        grid = {}
+
+        for box in boxes:
+            x1, y1, x2, y2 = box[:4]
+            centroid = ((x1 + x2) / 2.0, (y1 + y2) / 2.0)
+            cx, cy = self._cell(centroid)
+
+            # Nearest unclaimed centroid from the previous frame in the 3x3 neighbourhood
+            best, best_cell, best_distance = None, None, limit
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    for point in self.grid.get((gx, gy), ()):
+                        distance = (point[0] - centroid[0]) ** 2 + (point[1] - centroid[1]) ** 2
+                        if distance <= best_distance:
+                            best, best_cell, best_distance = point, (gx, gy), distance
+
+            if best is not None:
+                self.grid[best_cell].remove(best)
+                for line in self.lines:
+                    line.check(best, centroid)
+
+            grid.setdefault((cx, cy), []).append(centroid)
+
+        self.grid = grid
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        """Crossing counts per line"""
+        return {line.name: {'in': line.count_in, 'out': line.count_out} for line in self.lines}
@@ -0,0 +1,84 @@
+import time
+import numpy as np
+from typing import Optional
+
+
+class DetectionResult:
+    """Detections of one frame, stored as compact NumPy arrays
+
+    boxes is an (N, 4) float32 array of (x1, y1, x2, y2) pixel coordinates,
+    scores an (N,) float32 array of confidences and class_ids an (N,) int32
+    array (0 = person). track_ids is filled in by the tracker when enabled.
+    Instances are small and pickle cheaply, so they can be passed between
+    threads and processes; treat the arrays as read-only once created.
+    """
+
+    __slots__ = ('boxes', 'scores', 'class_ids', 'track_ids', 'frame_id', 'timestamp')
+
+    def __init__(self, boxes=None, scores=None, class_ids=None, frame_id: int = 0,
+                 timestamp: Optional[float] = None, track_ids=None):
+        self.boxes = (np.zeros((0, 4), dtype=np.float32) if boxes is None
+                      else np.asarray(boxes, dtype=np.float32).reshape(-1, 4))
+        n = len(self.boxes)
+        self.scores = (np.ones(n, dtype=np.float32) if scores is None
+                       else np.asarray(scores, dtype=np.float32).reshape(n))
+        self.class_ids = (np.zeros(n, dtype=np.int32) if class_ids is None
+                          else np.asarray(class_ids, dtype=np.int32).reshape(n))
+        self.track_ids = track_ids
+        self.frame_id = frame_id
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __repr__(self) -> str:
+        return f"DetectionResult(frame_id={self.frame_id}, count={len(self)})"
+
+    @property
+    def count(self) -> int:
+        return len(self.boxes)
+
+    def with_frame(self, frame_id: int, timestamp: Optional[float] = None) -> 'DetectionResult':
+        """Same detections attributed to another frame (arrays are shared, not copied)"""
+        return DetectionResult(self.boxes, self.scores, self.class_ids, frame_id, timestamp)
+
+    def translated(self, dx: float, dy: float) -> 'DetectionResult':
+        """Detections shifted by (dx, dy), e.g. from crop to frame coordinates"""
+        return DetectionResult(self.boxes + np.float32([dx, dy, dx, dy]), self.scores,
+                               self.class_ids, self.frame_id, self.timestamp)
+
+    def scaled(self, factor: float) -> 'DetectionResult':
+        """Detections with box coordinates multiplied by factor, e.g. from inference to frame size"""
+        return DetectionResult(self.boxes * np.float32(factor), self.scores,
+                               self.class_ids, self.frame_id, self.timestamp)
+
+    def select(self, mask) -> 'DetectionResult':
+        """Subset of detections by boolean mask or index array"""
+        return DetectionResult(self.boxes[mask], self.scores[mask], self.class_ids[mask],
+                               self.frame_id, self.timestamp)
+
+    def sorted_by_score(self) -> 'DetectionResult':
+        """Detections in descending confidence order"""
+        return self.select(np.argsort(-self.scores, kind='stable'))
+
+    @staticmethod
+    def concatenate(results, frame_id: int = 0, timestamp: Optional[float] = None) -> 'DetectionResult':
+        """Merge several results into one"""
+        results = list(results)
+        if not results:
+            return DetectionResult(frame_id=frame_id, timestamp=timestamp)
+        return DetectionResult(np.concatenate([r.boxes for r in results]),
+                               np.concatenate([r.scores for r in results]),
+                               np.concatenate([r.class_ids for r in results]),
+                               frame_id, timestamp)
+
+    def to_dict(self) -> dict:
+        """Plain JSON-serialisable representation"""
+        return {
+            'frame_id': self.frame_id,
+            'timestamp': self.timestamp,
+            'count': len(self),
+            'boxes': np.round(self.boxes.astype(np.float64), 1).tolist(),
+            'scores': np.round(self.scores.astype(np.float64), 3).tolist(),
+            'track_ids': None if self.track_ids is None else [int(i) for i in self.track_ids],
+        }
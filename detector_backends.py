@@ -0,0 +1,51 @@
+import os
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class DetectorBackend(NamedTuple):
+    """A detection method and the capabilities the pipeline plans around
+
+    setup(detector) loads the model onto a PersonDetector and
+    detect(detector, frame) returns a DetectionResult. detect_batch, if
+    given, takes a list of frames and returns one result per frame.
+    """
+
+    name: str
+    setup: Callable
+    detect: Callable
+    detect_batch: Optional[Callable] = None
+    batch_size: int = 1              # Preferred frames per detect_batch call
+    input_size: Optional[int] = None  # Longest image side the model runs at; larger frames are downscaled first
+    thread_safe: bool = False        # One instance may be called from several threads at once
+    warmup_frames: int = 0           # Calls before timings are representative (model load, JIT, caches)
+    max_workers: Optional[int] = None  # Parallel instances worth running (None: one per core)
+
+    @property
+    def supports_batch(self) -> bool:
+        return self.detect_batch is not None
+
+    def recommended_workers(self, cpus: Optional[int] = None) -> int:
+        """Number of parallel detector instances to run on this machine"""
+        cpus = cpus or os.cpu_count() or 1
+        return max(1, min(cpus, self.max_workers or cpus))
+
+
+DETECTOR_BACKENDS: Dict[str, DetectorBackend] = {}
+
+
+def register_backend(name: str, setup: Callable, detect: Callable, **capabilities) -> DetectorBackend:
+    """Make a detection method available to PersonDetector(method=name) and the CLIs"""
+    backend = DetectorBackend(name.upper(), setup, detect, **capabilities)
+    DETECTOR_BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name: str) -> DetectorBackend:
+    try:
+        return DETECTOR_BACKENDS[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown detection method {name!r}, available: {', '.join(backend_names())}")
+
+
+def backend_names() -> List[str]:
+    return list(DETECTOR_BACKENDS)
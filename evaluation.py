@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Detection Accuracy vs Speed Evaluation
+======================================
+
+Runs PersonDetector over a labelled dataset for each detection method and
+config profile, and reports precision, recall and average precision at
+several IoU thresholds next to throughput and latency.
+
+Usage:
+    # Folder of images, labels in <folder>/labels.jsonl ({"image": "a.jpg", "boxes": [...]})
+    python evaluation.py --dataset data/lobby --methods HOG YOLO CASCADE
+
+    # Video clip with per-frame labels ({"frame": 0, "boxes": [...]})
+    python evaluation.py --dataset door.mp4 --labels door.jsonl \\
+                         --profiles profiles/door.json --csv results.csv
+
+    # Reproducible synthetic scene, labelled by the generator (see synthetic.py)
+    python evaluation.py --dataset "synthetic://hard?seed=1" --max-frames 200
+"""
+
+import argparse
+import csv
+import os
+import time
+import cv2
+import numpy as np
+from typing import Iterator, List, Optional, Tuple
+import config
+from detector_backends import backend_names
+from metrics import load_ground_truth, match_detections, average_precision
+from person_detection import PersonDetector
+from tuning import PROFILE_KEYS, load_profile
+
+IOU_THRESHOLDS = [round(0.5 + 0.05 * i, 2) for i in range(10)]  # COCO-style 0.50:0.95
+
+
+def open_synthetic(spec: str):
+    """Opened SyntheticSource for a "synthetic://..." dataset (frames rendered on demand)"""
+    from synthetic import synthetic_from_spec
+    source = synthetic_from_spec(spec)
+    source.realtime = False
+    source.open()
+    return source
+
+
+def iterate_dataset(dataset: str, ground_truth: dict,
+                    max_frames: Optional[int] = None) -> Iterator[Tuple[object, np.ndarray]]:
+    """Yield (key, frame) for every labelled image or video frame"""
+    if dataset.startswith('synthetic://'):
+        source = open_synthetic(dataset)
+        for index in sorted(ground_truth):
+            if max_frames is not None and index >= max_frames:
+                break
+            yield index, source.render(index)
+        source.close()
+        return
+
+    if os.path.isdir(dataset):
+        for i, key in enumerate(sorted(ground_truth)):
+            if max_frames is not None and i >= max_frames:
+                break
+            frame = cv2.imread(os.path.join(dataset, key))
+            if frame is None:
+                print(f"⚠ Cannot read image {key}, skipped")
+                continue
+            yield key, frame
+        return
+
+    cap = cv2.VideoCapture(dataset)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open dataset {dataset}")
+    index = 0
+    while max_frames is None or index < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index in ground_truth:
+            yield index, frame
+        index += 1
+    cap.release()
+
+
+def evaluate(detector: PersonDetector, dataset: str, ground_truth: dict,
+             max_frames: Optional[int] = None) -> dict:
+    """Evaluate one detector configuration over the dataset"""
+    latencies = []
+    scores = []
+    hits = {t: [] for t in IOU_THRESHOLDS}
+    num_ground_truth = 0
+    warmed_up = False
+
+    for key, frame in iterate_dataset(dataset, ground_truth, max_frames):
+        if not warmed_up:
+            # Exclude one-off model initialisation from the timings
+            for _ in range(detector.backend.warmup_frames):
+                detector.detect_boxes(frame)
+            warmed_up = True
+
+        start = time.perf_counter()
+        result = detector.detect_boxes(frame).sorted_by_score()
+        latencies.append(time.perf_counter() - start)
+
+        scores.append(result.scores)
+        truth = ground_truth[key]
+        num_ground_truth += len(truth)
+        for t in IOU_THRESHOLDS:
+            hits[t].append(match_detections(result.boxes, truth, t))
+
+    if not latencies:
+        raise ValueError("No labelled frames found in dataset")
+
+    scores = np.concatenate(scores)
+    hits = {t: np.concatenate(h) for t, h in hits.items()}
+    tp = int(np.sum(hits[0.5]))
+    ap = {t: average_precision(scores, hits[t], num_ground_truth) for t in IOU_THRESHOLDS}
+    latency_ms = np.asarray(latencies) * 1000
+    return {
+        'frames': len(latencies),
+        'precision': tp / len(scores) if len(scores) else 0.0,
+        'recall': tp / num_ground_truth if num_ground_truth else 0.0,
+        'ap50': ap[0.5],
+        'ap75': ap[0.75],
+        'map': float(np.mean(list(ap.values()))),
+        'fps': len(latencies) / float(np.sum(latencies)),
+        'latency_p50_ms': float(np.percentile(latency_ms, 50)),
+        'latency_p95_ms': float(np.percentile(latency_ms, 95)),
+    }
+
+
+def print_table(rows: List[dict]):
+    """Print the comparison table"""
+    header = (f"{'Method':<9}{'Profile':<16}{'Prec':>7}{'Recall':>8}{'AP50':>7}"
+              f"{'AP75':>7}{'mAP':>7}{'FPS':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['method']:<9}{r['profile'][:15]:<16}{r['precision']:>7.3f}{r['recall']:>8.3f}"
+              f"{r['ap50']:>7.3f}{r['ap75']:>7.3f}{r['map']:>7.3f}{r['fps']:>8.1f}"
+              f"{r['latency_p50_ms']:>9.1f}{r['latency_p95_ms']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare detection accuracy and speed')
+    parser.add_argument('--dataset', required=True,
+                        help='Image folder, video file or synthetic://[difficulty][?options] scene')
+    parser.add_argument('--labels', help='Ground truth JSON Lines (default: <dataset>/labels.jsonl)')
+    parser.add_argument('--methods', nargs='+', default=[config.DETECTION_METHOD],
+                        choices=backend_names(), help='Detection methods to compare')
+    parser.add_argument('--profiles', nargs='*', default=[],
+                        help='Config profiles to compare against the default config')
+    parser.add_argument('--max-frames', type=int, default=None,
+                        help='Evaluate at most this many labelled items')
+    parser.add_argument('--csv', help='Also write the results to this CSV file')
+    args = parser.parse_args()
+
+    if args.dataset.startswith('synthetic://'):
+        # Ground truth comes from the generator itself
+        source = open_synthetic(args.dataset)
+        ground_truth = source.ground_truth_labels(args.max_frames or source.frames or config.SYNTHETIC_EVAL_FRAMES)
+        source.close()
+    else:
+        labels = args.labels or os.path.join(args.dataset, 'labels.jsonl')
+        ground_truth = load_ground_truth(labels)
+    defaults = {key: getattr(config, key) for key in PROFILE_KEYS}
+
+    print("📏 Detection Evaluation")
+    print("=" * 40)
+    print(f"📂 Dataset: {args.dataset} ({len(ground_truth)} labelled)")
+
+    rows = []
+    for profile in [None] + args.profiles:
+        for key, value in defaults.items():
+            setattr(config, key, value)
+        profile_name = 'default'
+        if profile:
+            profile_name = load_profile(profile).get('name', os.path.basename(profile))
+
+        for method in args.methods:
+            detector = PersonDetector(method=method)
+            if detector.method != method:
+                print(f"⚠ {method} unavailable, skipped")
+                continue
+            result = evaluate(detector, args.dataset, ground_truth, args.max_frames)
+            rows.append({'method': method, 'profile': profile_name, **result})
+
+    print("=" * 40)
+    print_table(rows)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"💾 Results saved: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+from typing import Optional
+import config
+from detection_result import DetectionResult
+
+
+def frame_hash(frame: np.ndarray) -> int:
+    """64-bit difference hash (dHash) of a frame's 9x8 grayscale thumbnail"""
+    thumbnail = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+    if thumbnail.ndim == 3:
+        thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+    bits = thumbnail[:, 1:] > thumbnail[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class StaticSceneCache:
+    """Reuses the last detections while the scene looks unchanged
+
+    The hash of each new frame is compared with the hash of the frame the
+    cached detections were computed on (not the previous frame), so slow
+    drift still triggers a fresh detection. Results are reused for at most
+    ``max_age`` frames.
+    """
+
+    def __init__(self, threshold: int = None, max_age: int = None):
+        self.threshold = threshold if threshold is not None else config.STATIC_CACHE_THRESHOLD
+        self.max_age = max_age if max_age is not None else config.STATIC_CACHE_MAX_AGE
+        self.anchor_hash = None
+        self.result = None
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.pending_hash = None
+
+    def lookup(self, frame: np.ndarray) -> Optional[DetectionResult]:
+        """Return the cached result if the frame matches the cached scene, else None"""
+        current = frame_hash(frame)
+        if (self.result is not None and self.age < self.max_age
+                and (current ^ self.anchor_hash).bit_count() <= self.threshold):
+            self.age += 1
+            self.hits += 1
+            return self.result
+
+        self.pending_hash = current
+        self.misses += 1
+        return None
+
+    def store(self, result: DetectionResult):
+        """Cache the detections computed for the frame of the last missed lookup"""
+        self.anchor_hash = self.pending_hash
+        self.result = result
+        self.age = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
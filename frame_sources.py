@@ -0,0 +1,338 @@
+import importlib
+import os
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import config
+
+# OpenCV capture backends selectable by name
+BACKENDS = {
+    'ANY': cv2.CAP_ANY,
+    'V4L2': cv2.CAP_V4L2,
+    'FFMPEG': cv2.CAP_FFMPEG,
+    'GSTREAMER': cv2.CAP_GSTREAMER,
+    'DSHOW': cv2.CAP_DSHOW,
+    'MSMF': cv2.CAP_MSMF,
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+STREAM_PREFIXES = ('rtsp://', 'rtmp://', 'http://', 'https://', 'udp://', 'tcp://')
+
+# Extra "scheme://..." sources registered by other modules
+SOURCE_SCHEMES: Dict[str, Callable[[str], 'FrameSource']] = {}
+
+# Camera formats probed per device: (fourcc, width, height) -> actual (fourcc, width, height, fps)
+_PROBED_FORMATS: Dict[Tuple[Union[int, str], str], Tuple[str, int, int, float]] = {}
+
+# Modules that register a scheme when imported, loaded on first use
+BUILTIN_SCHEME_MODULES = {
+    'replay': 'recording',
+    'synthetic': 'synthetic',
+}
+
+
+class FrameSource:
+    """Base class for anything that produces frames
+
+    read() returns (ret, frame, timestamp) where timestamp is the wall-clock
+    time (time.time()) at which the frame was captured or decoded.
+    """
+
+    name = 'source'
+    is_live = False
+    can_pause = False  # pause()/resume() keep the source open cheaply
+    can_reconnect = False  # close() + open() may recover after failed reads
+
+    def open(self) -> bool:
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        raise NotImplementedError
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class CaptureSource(FrameSource):
+    """cv2.VideoCapture based source: camera devices, video files and network streams"""
+
+    def __init__(self, target: Union[int, str], backend: str = None):
+        self.target = target
+        self.backend = (backend or config.CAPTURE_BACKEND).upper()
+        self.is_live = isinstance(target, int) or str(target).lower().startswith(STREAM_PREFIXES)
+        self.name = f"camera {target}" if isinstance(target, int) else str(target)
+        self.can_pause = isinstance(target, int)
+        self.can_reconnect = self.is_live
+        self.cap = None
+        self.format = None  # (fourcc, width, height, fps) negotiated with a camera device
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.target, BACKENDS.get(self.backend, cv2.CAP_ANY))
+        if not self.cap.isOpened():
+            return False
+
+        if isinstance(self.target, int):
+            # Keep at most one frame queued in the driver so reads are fresh
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, config.CAPTURE_BUFFER_SIZE)
+            if config.CAMERA_PROBE_FORMATS:
+                key = (self.target, self.backend)
+                if key not in _PROBED_FORMATS:
+                    _PROBED_FORMATS[key] = probe_camera_format(self.cap)
+                self.format = apply_camera_format(self.cap, *_PROBED_FORMATS[key][:3])
+                print(f"✓ Camera format {self.format[0]} {self.format[1]}x{self.format[2]} @ {self.format[3]:.0f} FPS")
+            else:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.CAMERA_WIDTH)
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.CAMERA_HEIGHT)
+                self.cap.set(cv2.CAP_PROP_FPS, config.CAMERA_FPS)
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        if self.cap is None:
+            return False, None, time.time()
+        ret, frame = self.cap.read()
+        return ret, frame, time.time()
+
+    def resume(self):
+        if self.cap is not None:
+            # Discard the frame the driver kept while nobody was reading
+            self.cap.grab()
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+def _fourcc_name(code: float) -> str:
+    code = int(code)
+    return ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00')
+
+
+def apply_camera_format(cap: cv2.VideoCapture, fourcc: str, width: int, height: int) -> Tuple[str, int, int, float]:
+    """Request a pixel format, size and the target FPS, returns what the driver actually set"""
+    # Pixel format first: the sizes and rates a camera offers depend on it
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, config.CAMERA_FPS)
+    return (_fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), float(cap.get(cv2.CAP_PROP_FPS)))
+
+
+def probe_camera_format(cap: cv2.VideoCapture) -> Tuple[str, int, int, float]:
+    """Cheapest (fourcc, width, height, fps) that meets CAMERA_WIDTH/HEIGHT and CAMERA_FPS
+
+    Sizes at or above the target are tried smallest first and, per size,
+    formats in CAMERA_FORMATS order (cheapest to decode first); the first
+    combination the driver accepts at the target FPS wins. If none does, the
+    fastest combination seen is used.
+    """
+    target = (config.CAMERA_WIDTH, config.CAMERA_HEIGHT)
+    sizes = sorted({target} | {size for size in config.CAMERA_PROBE_RESOLUTIONS
+                               if size[0] >= target[0] and size[1] >= target[1]},
+                   key=lambda size: size[0] * size[1])
+
+    fastest = None
+    for width, height in sizes:
+        for fourcc in config.CAMERA_FORMATS:
+            actual = apply_camera_format(cap, fourcc, width, height)
+            if actual[0] != fourcc or actual[1] < target[0] or actual[2] < target[1]:
+                continue
+            if actual[3] >= config.CAMERA_FPS * 0.95:
+                return actual
+            if fastest is None or actual[3] > fastest[3]:
+                fastest = actual
+    if fastest is not None:
+        return fastest
+    return (config.CAMERA_FORMATS[-1], target[0], target[1], float(config.CAMERA_FPS))
+
+
+class ImageFolderSource(FrameSource):
+    """Images of a directory tree in sorted order"""
+
+    def __init__(self, directory: str, loop: bool = False):
+        self.directory = directory
+        self.loop = loop
+        self.name = directory
+        self.files: List[str] = []
+        self.index = 0
+
+    def open(self) -> bool:
+        self.files = list_images(self.directory)
+        self.index = 0
+        return bool(self.files)
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        while self.index < len(self.files):
+            path = self.files[self.index]
+            self.index += 1
+            if self.loop and self.index == len(self.files):
+                self.index = 0
+            frame = cv2.imread(path)
+            if frame is not None:
+                return True, frame, time.time()
+            print(f"⚠ Cannot read image {path}, skipped")
+        return False, None, time.time()
+
+
+class ThreadedSource(FrameSource):
+    """Decodes frames of another source on a background thread
+
+    Live sources keep only the newest frame so the consumer never falls
+    behind real time; files and folders are queued so no frame is dropped.
+    After failed live reads (unplugged camera, dropped stream) the thread
+    backs off exponentially and, for sources that support it, reopens the
+    source every CAPTURE_REOPEN_AFTER failures.
+    """
+
+    def __init__(self, source: FrameSource, queue_size: int = None):
+        self.source = source
+        self.name = source.name
+        self.is_live = source.is_live
+        self.can_pause = source.can_pause
+        self.frames = queue.Queue(maxsize=1 if self.is_live else (queue_size or config.CAPTURE_QUEUE_SIZE))
+        self.thread = None
+        self.running = False
+        self.active = threading.Event()  # Cleared while paused
+        self.active.set()
+        self.stopped = threading.Event()  # Interrupts retry backoff on close()
+        self.failures = 0  # Consecutive failed live reads
+
+    def open(self) -> bool:
+        if not self.source.open():
+            return False
+        self.running = True
+        self.stopped.clear()
+        self.failures = 0
+        self.thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def _decode_loop(self):
+        paused = False
+        while self.running:
+            if not self.active.is_set():
+                paused = True
+                self.active.wait(0.1)
+                continue
+            if paused:
+                # Resume on this thread so it never races with a read
+                self.source.resume()
+                paused = False
+
+            item = self.source.read()
+            if self.is_live:
+                # Replace a frame the consumer has not picked up yet
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+                self.frames.put(item)
+            else:
+                while self.running:
+                    try:
+                        self.frames.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+            if not item[0]:
+                if not self.is_live:
+                    break
+                self._recover()
+            else:
+                self.failures = 0
+
+    def _recover(self):
+        """Back off after a failed live read and periodically try to reopen the source"""
+        self.failures += 1
+        delay = min(config.CAPTURE_RETRY_DELAY * 2 ** (self.failures - 1), config.CAPTURE_RETRY_MAX_DELAY)
+        if self.stopped.wait(delay):
+            return
+        if self.source.can_reconnect and self.failures % config.CAPTURE_REOPEN_AFTER == 0:
+            self.source.close()
+            if self.source.open():
+                print(f"✓ Source {self.name} reopened after {self.failures} failed reads")
+            else:
+                print(f"⚠ Source {self.name} unavailable, retrying")
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        if not self.running and self.frames.empty():
+            return False, None, time.time()
+        try:
+            return self.frames.get(timeout=config.CAPTURE_READ_TIMEOUT)
+        except queue.Empty:
+            return False, None, time.time()
+
+    def pause(self):
+        """Stop decoding but keep the source open"""
+        self.active.clear()
+        self.source.pause()
+        try:
+            # Wake a reader blocked waiting for a frame
+            self.frames.put_nowait((False, None, time.time()))
+        except queue.Full:
+            pass
+
+    def resume(self):
+        # Frames decoded before the pause are stale
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+        self.active.set()
+
+    def close(self):
+        self.running = False
+        self.stopped.set()
+        self.active.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+        self.source.close()
+
+
+def list_images(directory: str) -> List[str]:
+    """All image files below a directory, sorted"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def register_source_scheme(scheme: str, factory: Callable[[str], FrameSource]):
+    """Make open_source() accept "scheme://..." specs built by factory(spec)"""
+    SOURCE_SCHEMES[scheme.lower()] = factory
+
+
+def open_source(spec: Union[int, str], backend: str = None,
+                threaded: Optional[bool] = None) -> FrameSource:
+    """Build a frame source from a device index, file, folder or URL (not yet opened)"""
+    if isinstance(spec, str) and spec.isdigit():
+        spec = int(spec)
+
+    scheme = spec.split('://', 1)[0].lower() if isinstance(spec, str) and '://' in spec else None
+    if scheme in BUILTIN_SCHEME_MODULES and scheme not in SOURCE_SCHEMES:
+        importlib.import_module(BUILTIN_SCHEME_MODULES[scheme])
+
+    if scheme in SOURCE_SCHEMES:
+        source = SOURCE_SCHEMES[scheme](spec)
+    elif isinstance(spec, str) and os.path.isdir(spec):
+        source = ImageFolderSource(spec)
+    else:
+        source = CaptureSource(spec, backend)
+
+    if threaded is None:
+        threaded = config.THREADED_CAPTURE
+    return ThreadedSource(source) if threaded else source
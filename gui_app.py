@@ -6,6 +6,11 @@ import threading
 import time
 import datetime
 from person_detection import PersonDetector, CameraManager
+from detector_backends import backend_names
+from buffers import BufferPool
+from latency import LatencyTracker
+from charts import LiveChart, TimeSeries
+from profiler import span
 import config
 
 class PersonDetectionGUI:
@@ -17,17 +22,49 @@ class PersonDetectionGUI:
 
         # Initialize components
         self.detector = PersonDetector(method=config.DETECTION_METHOD)
-        self.camera = CameraManager(config.CAMERA_INDEX)
+        self.selected_method = config.DETECTION_METHOD  # Method chosen by the user, before any fallback
+        self.camera = CameraManager(config.CAMERA_SOURCE)
 
         # GUI variables
         self.is_running = False
         self.current_frame = None
+        self.current_timestamp = None  # Capture time of current_frame
+        self.displayed_timestamp = None
+        self.latency = LatencyTracker()
         self.photo_image = None
+        self.buffers = BufferPool()
+
+        # Chart samples taken on every GUI refresh
+        self.count_series = TimeSeries()
+        self.fps_series = TimeSeries()
+        self.latency_series = TimeSeries()
+        self.last_sample = None  # (time, detector.frame_index) of the previous sample
+        self.last_latency = None
+        self.last_chart_draw = 0.0
+
+        # History panel state: newest frame_id shown, number of lines in the widget and
+        # the run of equal counts on the last line, [count, first timestamp, last timestamp]
+        self.history_seq = 0
+        self.history_lines = 0
+        self.history_run = None
 
         # Threading
         self.detection_thread = None
         self.stop_thread = False
 
+        # Optional HTTP API for dashboards, kept up while the window is open
+        self.api = None
+        if config.API_PORT:
+            from api_server import ApiServer
+            self.api = ApiServer()
+            self.api.start()
+
+        # Optional count publishing to an aggregator
+        self.publisher = None
+        if config.PUBLISH_TARGET:
+            from count_protocol import CountPublisher
+            self.publisher = CountPublisher()
+
         self.setup_gui()
 
     def setup_gui(self):
@@ -63,6 +100,15 @@ class PersonDetectionGUI:
                                    relief=tk.RAISED, bd=2)
         video_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
 
+        # Live charts below the video, packed first so the video cannot squeeze them out
+        charts_frame = tk.Frame(video_frame, bg='#34495e')
+        charts_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+        self.count_chart = LiveChart(charts_frame, "Persons", '#e74c3c')
+        self.fps_chart = LiveChart(charts_frame, "FPS", '#2ecc71', min_range=5.0)
+        self.latency_chart = LiveChart(charts_frame, "Latency", '#f1c40f', unit=' ms', min_range=50.0)
+        for chart in (self.count_chart, self.fps_chart, self.latency_chart):
+            chart.canvas.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
+
         # Video display label
         self.video_label = tk.Label(video_frame, bg='black', 
                                    text="Camera Feed will appear here\nClick 'Start Detection' to begin",
@@ -121,7 +167,7 @@ class PersonDetectionGUI:
 
         tk.Label(method_frame, text="🔍 Detection Method:", 
                 font=('Arial', 10, 'bold'), fg='white', bg='#34495e').pack(anchor='w')
-        self.method_label = tk.Label(method_frame, text=config.DETECTION_METHOD, 
+        self.method_label = tk.Label(method_frame, text=self.detector.method, 
                                     font=('Arial', 12, 'bold'), fg='#2ecc71', bg='#34495e')
         self.method_label.pack(anchor='w')
 
@@ -140,6 +186,18 @@ class PersonDetectionGUI:
                                  font=('Arial', 10), fg='white', bg='#34495e')
         self.max_label.pack(anchor='w', pady=2)
 
+        self.occupancy_label = tk.Label(stats_info_frame, text="Occupied: --", 
+                                       font=('Arial', 10), fg='white', bg='#34495e')
+        self.occupancy_label.pack(anchor='w', pady=2)
+
+        self.unique_label = tk.Label(stats_info_frame, text="Unique Persons: --", 
+                                    font=('Arial', 10), fg='white', bg='#34495e')
+        self.unique_label.pack(anchor='w', pady=2)
+
+        self.latency_label = tk.Label(stats_info_frame, text="Latency: --", 
+                                     font=('Arial', 10), fg='white', bg='#34495e')
+        self.latency_label.pack(anchor='w', pady=2)
+
         # Recent detections history
         history_frame = tk.LabelFrame(stats_frame, text="📋 Recent History", 
                                      font=('Arial', 10, 'bold'),
@@ -182,7 +240,7 @@ class PersonDetectionGUI:
         self.stop_button.pack(side=tk.LEFT, padx=10)
 
         # Method toggle button
-        self.toggle_button = tk.Button(button_frame, text="🔄 Switch to YOLO", 
+        self.toggle_button = tk.Button(button_frame, text=f"🔄 Switch to {self.next_method()}",
                                       command=self.toggle_method,
                                       font=('Arial', 12, 'bold'),
                                       bg='#3498db', fg='white',
@@ -198,6 +256,8 @@ class PersonDetectionGUI:
 
         self.is_running = True
         self.stop_thread = False
+        self.latency.reset()
+        self.last_sample = None
 
         # Update button states
         self.start_button.config(state=tk.DISABLED)
@@ -227,48 +287,106 @@ class PersonDetectionGUI:
         # Clear video display
         self.video_label.config(image='', text="Detection Stopped\nClick 'Start Detection' to begin again")
 
+    def next_method(self) -> str:
+        """Registered detection method after the selected one (see detector_backends.py)"""
+        names = backend_names()
+        current = self.selected_method.upper()
+        return names[(names.index(current) + 1) % len(names)] if current in names else names[0]
+
     def toggle_method(self):
-        """Toggle between HOG and YOLO detection methods"""
-        current_method = self.detector.method
-        new_method = "YOLO" if current_method == "HOG" else "HOG"
+        """Cycle through the registered detection methods"""
+        if self.is_running:
+            # Worker processes are built from the current detector at start
+            messagebox.showwarning("Busy", "Stop detection before switching method")
+            return
+
+        new_method = self.next_method()
 
         try:
             self.detector = PersonDetector(method=new_method)
-            self.method_label.config(text=new_method)
-            self.toggle_button.config(text=f"🔄 Switch to {'HOG' if new_method == 'YOLO' else 'YOLO'}")
-            messagebox.showinfo("Success", f"Switched to {new_method} detection method")
+            # Keep cycling from the chosen method even if it fell back to another one
+            self.selected_method = new_method
+            self.clear_history()
+            self.method_label.config(text=self.detector.method)
+            self.toggle_button.config(text=f"🔄 Switch to {self.next_method()}")
+            if self.detector.method != new_method:
+                messagebox.showwarning("Unavailable", f"{new_method} is unavailable, using {self.detector.method}")
+            else:
+                messagebox.showinfo("Success", f"Switched to {new_method} detection method")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to switch method: {str(e)}")
 
     def detection_loop(self):
         """Main detection loop running in separate thread"""
+        if config.DETECTION_WORKERS > 1:
+            self.pooled_detection_loop()
+            return
+
         while not self.stop_thread and self.is_running:
-            ret, frame = self.camera.read_frame()
+            ret, frame, timestamp = self.camera.read_frame_timestamped()
             if ret:
                 # Perform detection
-                annotated_frame, count = self.detector.detect_persons(frame)
+                annotated_frame, count = self.detector.detect_persons(frame, timestamp)
+                self.current_timestamp = timestamp
                 self.current_frame = annotated_frame
+                self.publish_counts()
 
             time.sleep(0.03)  # ~30 FPS
 
+    def pooled_detection_loop(self):
+        """Detection loop feeding frames to worker processes, results arrive in frame order"""
+        from worker_pool import SharedMemoryDetectorPool
+        pool = SharedMemoryDetectorPool(self.detector)
+        try:
+            while not self.stop_thread and self.is_running:
+                with span('pool.process'):
+                    ret, frame, result = pool.process(self.camera.read_frame_timestamped)
+                if ret:
+                    annotated_frame, count = self.detector.apply_detections(frame, result, result.timestamp)
+                    self.current_timestamp = result.timestamp
+                    self.current_frame = annotated_frame
+                    self.publish_counts()
+                else:
+                    time.sleep(0.03)
+        finally:
+            pool.shutdown()
+
+    def publish_counts(self):
+        """Hand the latest frame to the API and the aggregator publisher"""
+        with span('publish'):
+            if self.api is not None:
+                self.api.publish(self.detector)
+            if self.publisher is not None:
+                self.publisher.publish(self.detector.last_frame_result)
+
     def update_gui(self):
         """Update GUI elements (runs on main thread)"""
         if not self.is_running:
             return
 
-        # Update time
-        current_time = datetime.datetime.now().strftime("%H:%M:%S")
-        self.time_label.config(text=current_time)
+        with span('gui_update'):
+            # Update time
+            current_time = datetime.datetime.now().strftime("%H:%M:%S")
+            self.time_label.config(text=current_time)
 
-        # Update video display
-        if self.current_frame is not None:
-            self.update_video_display(self.current_frame)
+            # Update video display
+            if self.current_frame is not None:
+                timestamp = self.current_timestamp
+                with span('display'):
+                    self.update_video_display(self.current_frame)
+                if timestamp != self.displayed_timestamp:
+                    # Count each captured frame once, when it is first shown
+                    self.last_latency = self.latency.record(timestamp)
+                    self.displayed_timestamp = timestamp
 
-        # Update statistics
-        self.update_statistics()
+            # Update statistics
+            self.update_statistics()
 
-        # Update detection history
-        self.update_history()
+            # Update detection history
+            self.update_history()
+
+            # Update live charts
+            self.update_charts()
 
         # Schedule next update
         self.root.after(100, self.update_gui)  # Update every 100ms
@@ -278,10 +396,12 @@ class PersonDetectionGUI:
         # Resize frame to fit display
         display_width = 640
         display_height = 480
-        frame_resized = cv2.resize(frame, (display_width, display_height))
+        frame_resized = self.buffers.get('display', (display_height, display_width, 3))
+        cv2.resize(frame, (display_width, display_height), dst=frame_resized)
 
         # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
+        frame_rgb = self.buffers.get('display_rgb', (display_height, display_width, 3))
+        cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB, dst=frame_rgb)
 
         # Convert to PIL Image
         pil_image = Image.fromarray(frame_rgb)
@@ -300,32 +420,118 @@ class PersonDetectionGUI:
         self.count_label.config(text=str(stats['current_count']))
 
         # Update session statistics
-        self.avg_label.config(text=f"Average: {stats['avg_count']}")
-        self.max_label.config(text=f"Maximum: {stats['max_count']}")
+        # Session figures come from the rolling window, not the last few frames
+        window = config.STATS_DISPLAY_WINDOW
+        summary = stats['windows'][window]
+        self.avg_label.config(text=f"Average ({window}): {summary['mean']}")
+        self.max_label.config(text=f"Maximum ({window}): {summary['max']}")
+        self.occupancy_label.config(text=f"Occupied ({window}): {summary['occupancy'] * 100:.0f}%")
+        if 'unique_persons' in stats:
+            self.unique_label.config(text=f"Unique Persons: {stats['unique_persons']}")
+        self.latency_label.config(text=f"Latency: {self.latency.describe()}")
+
+    def update_charts(self):
+        """Sample count, FPS and latency, and redraw the charts every CHART_REFRESH_MS"""
+        now = time.time()
+        frames = self.detector.frame_index
+        if self.last_sample is not None:
+            last_time, last_frames = self.last_sample
+            if now > last_time:
+                self.fps_series.append(now, max(frames - last_frames, 0) / (now - last_time))
+        self.last_sample = (now, frames)
+        self.count_series.append(now, self.detector.person_count)
+        if self.last_latency is not None:
+            self.latency_series.append(now, self.last_latency * 1000)
+
+        if (now - self.last_chart_draw) * 1000 >= config.CHART_REFRESH_MS:
+            self.count_chart.draw(self.count_series)
+            self.fps_chart.draw(self.fps_series)
+            self.latency_chart.draw(self.latency_series)
+            self.last_chart_draw = now
 
     def update_history(self):
-        """Update detection history display"""
-        history = self.detector.get_detection_history()
-
-        # Clear current text
-        self.history_text.delete(1.0, tk.END)
-
-        # Add recent detections
-        for entry in reversed(history):  # Show most recent first
-            time_str = entry['time'].strftime("%H:%M:%S")
-            count = entry['count']
-            self.history_text.insert(tk.END, f"{time_str} - {count} person(s)\n")
-
-        # Auto-scroll to bottom
-        self.history_text.see(tk.END)
+        """Add detections recorded since the last refresh to the history display
+
+        One line per change of the person count, so the panel spans far more
+        time than one line per frame; the line of the current count is
+        extended in place. After a start or method switch the whole stored
+        history (HISTORY_LENGTH frames) is loaded.
+        """
+        new_entries = self.detector.get_history_since(self.history_seq)
+        if not new_entries:
+            return
+        self.history_seq = new_entries[-1].frame_id
+
+        # Only follow new entries if the user has not scrolled up
+        following = self.history_text.yview()[1] >= 0.999
+
+        runs = history_runs(new_entries, self.history_run)
+        if self.history_run is not None:
+            # The first run continues the last line, which is rewritten
+            self.history_text.delete('run_start', tk.END)
+            self.history_lines -= 1
+        self.history_text.insert(tk.END, "".join(format_history_run(run) for run in runs[:-1]))
+        self.history_text.mark_set('run_start', 'end-1c')
+        self.history_text.mark_gravity('run_start', tk.LEFT)
+        self.history_text.insert(tk.END, format_history_run(runs[-1]))
+        self.history_run = runs[-1]
+        self.history_lines += len(runs)
+
+        # Drop the oldest lines beyond the display cap
+        excess = self.history_lines - config.HISTORY_DISPLAY_LINES
+        if excess > 0:
+            self.history_text.delete('1.0', f'{excess + 1}.0')
+            self.history_lines -= excess
+
+        if following:
+            self.history_text.see(tk.END)
+
+    def clear_history(self):
+        """Empty the history display, e.g. after the detector was replaced"""
+        self.history_text.delete('1.0', tk.END)
+        self.history_seq = 0
+        self.history_lines = 0
+        self.history_run = None
 
     def on_closing(self):
         """Handle window closing"""
         if self.is_running:
             self.stop_detection()
+        self.camera.stop_camera(keep_warm=False)
+        if self.api is not None:
+            self.api.stop()
+        if self.publisher is not None:
+            self.publisher.close()
         self.root.destroy()
 
 
+def history_runs(entries, run=None) -> list:
+    """Group consecutive entries with the same count into [count, first, last timestamp] runs
+
+    `run` is the open run from the previous call; it is extended (as a copy)
+    when the first entries continue it.
+    """
+    runs = [list(run)] if run is not None else []
+    for entry in entries:
+        count = len(entry)
+        if runs and runs[-1][0] == count:
+            runs[-1][2] = entry.timestamp
+        else:
+            runs.append([count, entry.timestamp, entry.timestamp])
+    return runs
+
+
+def format_history_run(run) -> str:
+    count, first, last = run
+    line = f"{datetime.datetime.fromtimestamp(first).strftime('%H:%M:%S')} - {count} person(s)"
+    duration = last - first
+    if duration >= 60:
+        line += f" for {duration / 60:.0f} min"
+    elif duration >= 1:
+        line += f" for {duration:.0f} s"
+    return line + "\n"
+
+
 def main():
     root = tk.Tk()
     app = PersonDetectionGUI(root)
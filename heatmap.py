@@ -0,0 +1,73 @@
+import os
+import time
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+import config
+
+
+class OccupancyHeatmap:
+    """Accumulates where people stand into a decaying low-resolution grid
+
+    Each update decays the grid once and adds all box footprints through a
+    2D difference array, so the cost depends only on the grid size and the
+    number of boxes in the current frame, never on how many frames came before.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, ...], cell_size: int = None,
+                 decay: float = None, output_dir: str = None):
+        self.cell_size = cell_size or config.HEATMAP_CELL_SIZE
+        self.decay = decay if decay is not None else config.HEATMAP_DECAY
+        self.output_dir = output_dir or config.HEATMAP_OUTPUT_DIR
+        self.frame_height, self.frame_width = frame_shape[:2]
+
+        rows = -(-self.frame_height // self.cell_size)
+        cols = -(-self.frame_width // self.cell_size)
+        self.grid = np.zeros((rows, cols), dtype=np.float32)
+        self._diff = np.zeros((rows + 1, cols + 1), dtype=np.float32)
+        self.last_export = time.time()
+
+    def update(self, boxes: List):
+        """Decay the grid and add the footprint of every box"""
+        self.grid *= self.decay
+        if len(boxes) == 0:
+            return
+
+        b = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        # Footprint: the lower part of each box, where the person stands
+        top = b[:, 3] - (b[:, 3] - b[:, 1]) * config.HEATMAP_FOOTPRINT
+        rows, cols = self.grid.shape
+        x1 = np.clip(b[:, 0] // self.cell_size, 0, cols).astype(np.int64)
+        x2 = np.clip(np.ceil(b[:, 2] / self.cell_size), 0, cols).astype(np.int64)
+        y1 = np.clip(top // self.cell_size, 0, rows).astype(np.int64)
+        y2 = np.clip(np.ceil(b[:, 3] / self.cell_size), 0, rows).astype(np.int64)
+
+        diff = self._diff
+        diff.fill(0)
+        np.add.at(diff, (y1, x1), 1.0)
+        np.add.at(diff, (y1, x2), -1.0)
+        np.add.at(diff, (y2, x1), -1.0)
+        np.add.at(diff, (y2, x2), 1.0)
+        self.grid += diff.cumsum(axis=0).cumsum(axis=1)[:rows, :cols]
+
+    def render(self) -> np.ndarray:
+        """Colour image of the heatmap at frame resolution"""
+        peak = float(self.grid.max())
+        scaled = (self.grid * (255.0 / peak)) if peak > 0 else self.grid
+        image = cv2.applyColorMap(scaled.astype(np.uint8), cv2.COLORMAP_JET)
+        return cv2.resize(image, (self.frame_width, self.frame_height), interpolation=cv2.INTER_NEAREST)
+
+    def export(self, name: str = 'heatmap') -> str:
+        """Write the heatmap as a PNG image and a NumPy file, returns the base path"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, name)
+        cv2.imwrite(base + '.png', self.render())
+        np.save(base + '.npy', self.grid)
+        self.last_export = time.time()
+        return base
+
+    def maybe_export(self) -> Optional[str]:
+        """Export if the configured interval has elapsed"""
+        if time.time() - self.last_export >= config.HEATMAP_EXPORT_INTERVAL:
+            return self.export()
+        return None
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+from typing import Dict, Optional
+import config
+
+
+class LatencyTracker:
+    """Capture-to-display latency over the most recent frames
+
+    Latencies are kept in a fixed-size ring, so recording is O(1) and
+    percentiles are computed over at most ``window`` samples.
+    """
+
+    def __init__(self, window: int = None):
+        self.window = window or config.LATENCY_WINDOW
+        self.samples = np.zeros(self.window, dtype=np.float64)
+        self.count = 0
+        self.total = 0
+
+    def record(self, capture_timestamp: Optional[float], displayed_at: Optional[float] = None) -> Optional[float]:
+        """Record one displayed frame, returns its latency in seconds"""
+        if capture_timestamp is None:
+            return None
+        latency = (displayed_at if displayed_at is not None else time.time()) - capture_timestamp
+        self.samples[self.total % self.window] = latency
+        self.total += 1
+        self.count = min(self.count + 1, self.window)
+        return latency
+
+    def percentiles(self) -> Optional[Dict[str, float]]:
+        """p50/p95/p99 latency in milliseconds, None before the first frame"""
+        if not self.count:
+            return None
+        p50, p95, p99 = np.percentile(self.samples[:self.count], [50, 95, 99]) * 1000
+        return {'p50': round(p50, 1), 'p95': round(p95, 1), 'p99': round(p99, 1)}
+
+    def describe(self) -> str:
+        p = self.percentiles()
+        if p is None:
+            return "--"
+        return f"p50 {p['p50']:.0f} | p95 {p['p95']:.0f} | p99 {p['p99']:.0f} ms"
+
+    def reset(self):
+        self.count = 0
+        self.total = 0
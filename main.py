@@ -21,6 +21,9 @@ import argparse
 import sys
 import cv2
 from person_detection import PersonDetector, CameraManager
+from latency import LatencyTracker
+from detector_backends import backend_names, get_backend
+from profiler import span, start_profiling, stop_profiling
 import config
 
 def run_gui():
@@ -41,7 +44,7 @@ def run_terminal():
 
     # Initialize components
     detector = PersonDetector(method=config.DETECTION_METHOD)
-    camera = CameraManager(config.CAMERA_INDEX)
+    camera = CameraManager(config.CAMERA_SOURCE)
 
     if not camera.start_camera():
         print("❌ Error: Cannot access camera!")
@@ -53,28 +56,68 @@ def run_terminal():
     print("=" * 60)
 
     frame_count = 0
+    latency = LatencyTracker()
+
+    # Optional worker processes fed through shared memory
+    pool = None
+    if config.DETECTION_WORKERS > 1:
+        from worker_pool import SharedMemoryDetectorPool
+        pool = SharedMemoryDetectorPool(detector)
+
+    # Optional HTTP API for dashboards
+    api = None
+    if config.API_PORT:
+        from api_server import ApiServer
+        api = ApiServer()
+        api.start()
+
+    # Optional count publishing to an aggregator
+    publisher = None
+    if config.PUBLISH_TARGET:
+        from count_protocol import CountPublisher
+        publisher = CountPublisher()
 
     try:
         while True:
-            ret, frame = camera.read_frame()
+            if pool is None:
+                ret, frame, timestamp = camera.read_frame_timestamped()
+            else:
+                with span('pool.process'):
+                    ret, frame, result = pool.process(camera.read_frame_timestamped)
             if not ret:
                 print("❌ Error reading frame from camera")
                 break
 
             # Perform detection
-            annotated_frame, person_count = detector.detect_persons(frame)
+            if pool is None:
+                annotated_frame, person_count = detector.detect_persons(frame, timestamp)
+            else:
+                annotated_frame, person_count = detector.apply_detections(frame, result, result.timestamp)
+            with span('publish'):
+                if api is not None:
+                    api.publish(detector)
+                if publisher is not None:
+                    publisher.publish(detector.last_frame_result)
 
             # Display frame
-            cv2.imshow('Person Detection - Press q to quit, s to save', annotated_frame)
+            with span('display'):
+                cv2.imshow('Person Detection - Press q to quit, s to save', annotated_frame)
+                key = cv2.waitKey(1) & 0xFF
+            latency.record(detector.last_frame_result.timestamp)
 
             # Print detection info every 30 frames (~1 second)
             frame_count += 1
             if frame_count % 30 == 0:
                 stats = detector.get_current_stats()
-                print(f"👥 Current: {stats['current_count']} | Avg: {stats['avg_count']} | Max: {stats['max_count']}")
+                unique = f" | Unique: {stats['unique_persons']}" if 'unique_persons' in stats else ""
+                window = stats['windows'][config.STATS_DISPLAY_WINDOW]
+                print(f"👥 Current: {stats['current_count']} | Avg ({config.STATS_DISPLAY_WINDOW}): {window['mean']} "
+                      f"| Max: {window['max']} | Occupied: {window['occupancy'] * 100:.0f}%{unique}")
+                for name, totals in stats.get('line_counts', {}).items():
+                    print(f"🚪 {name}: in {totals['in']} | out {totals['out']}")
+                print(f"⏱️ Latency: {latency.describe()}")
 
             # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
             if key == ord('q'):
                 break
             elif key == ord('s'):
@@ -88,7 +131,17 @@ def run_terminal():
 
     finally:
         # Cleanup
-        camera.stop_camera()
+        if latency.count:
+            print(f"⏱️ Capture-to-display latency: {latency.describe()}")
+        if detector.heatmap is not None:
+            print(f"🔥 Heatmap saved: {detector.heatmap.export()}.png")
+        if pool is not None:
+            pool.shutdown()
+        if api is not None:
+            api.stop()
+        if publisher is not None:
+            publisher.close()
+        camera.stop_camera(keep_warm=False)
         cv2.destroyAllWindows()
         print("✅ Cleanup completed")
 
@@ -97,28 +150,93 @@ def main():
     parser = argparse.ArgumentParser(description='Real-Time Person Detection System')
     parser.add_argument('--mode', '-m', choices=['gui', 'terminal'], default='gui',
                        help='Run mode: gui (default) or terminal')
-    parser.add_argument('--method', choices=['HOG', 'YOLO'], default=config.DETECTION_METHOD,
-                       help='Detection method: HOG (default) or YOLO')
+    parser.add_argument('--method', choices=backend_names(), default=config.DETECTION_METHOD,
+                       help='Detection method: HOG (default), YOLO or CASCADE (HOG proposals + YOLO)')
     parser.add_argument('--camera', '-c', type=int, default=config.CAMERA_INDEX,
                        help='Camera index (default: 0)')
+    parser.add_argument('--source', '-s', default=config.CAMERA_SOURCE,
+                       help='Video file, image folder, stream URL, replay://<recording>[?fast] or synthetic://[easy|medium|hard] instead of a camera')
+    parser.add_argument('--record', default=config.RECORD_PATH,
+                       help='Record raw frames and capture timestamps to this file for replay')
+    parser.add_argument('--backend', choices=['ANY', 'V4L2', 'FFMPEG', 'GSTREAMER', 'DSHOW', 'MSMF'],
+                       default=config.CAPTURE_BACKEND, help='OpenCV capture backend (default: ANY)')
+    parser.add_argument('--config-profile', default=config.CONFIG_PROFILE,
+                       help='Tuned config profile JSON written by tuning.py')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                       help='Enable adaptive quality with this per-frame detection budget')
+    parser.add_argument('--heatmap', action='store_true',
+                       help=f'Accumulate an occupancy heatmap into {config.HEATMAP_OUTPUT_DIR}/')
+    parser.add_argument('--static-cache', action='store_true',
+                       help='Reuse detections while the scene is unchanged')
+    parser.add_argument('--api-port', type=int, default=config.API_PORT,
+                       help='Serve counts and statistics over HTTP on this port (REST + server-sent events)')
+    parser.add_argument('--publish', default=config.PUBLISH_TARGET,
+                       help='Send counts to an aggregator at udp://host:port or tcp://host:port')
+    parser.add_argument('--camera-id', default=config.CAMERA_ID,
+                       help='Camera name sent with published counts (default: host name)')
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                       help='Record per-frame spans to a Chrome trace (.json) or speedscope (.speedscope.json) file')
+    parser.add_argument('--profile-sample-ms', type=float, default=config.PROFILE_SAMPLE_MS,
+                       help='With --profile, also sample Python stacks every N ms (0 = off)')
+    parser.add_argument('--workers', '-w', type=int, default=config.DETECTION_WORKERS,
+                       help='Detection worker processes (default: 1, in-process; 0 picks from the backend)')
 
     args = parser.parse_args()
 
+    # Apply tuned profile first so explicit arguments still take precedence
+    if args.config_profile:
+        from tuning import load_profile
+        load_profile(args.config_profile)
+
     # Update config with command line arguments
     config.DETECTION_METHOD = args.method
     config.CAMERA_INDEX = args.camera
+    config.CAMERA_SOURCE = args.source
+    config.CAPTURE_BACKEND = args.backend
+    config.RECORD_PATH = args.record
+    config.DETECTION_WORKERS = args.workers
+    if config.DETECTION_WORKERS == 0:
+        config.DETECTION_WORKERS = get_backend(config.DETECTION_METHOD).recommended_workers()
+    config.API_PORT = args.api_port
+    config.PUBLISH_TARGET = args.publish
+    config.CAMERA_ID = args.camera_id
+    if config.PUBLISH_TARGET:
+        from count_protocol import parse_target
+        try:
+            parse_target(config.PUBLISH_TARGET)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.heatmap:
+        config.HEATMAP_ENABLED = True
+    if args.static_cache:
+        config.STATIC_CACHE_ENABLED = True
+    if args.budget_ms is not None:
+        config.ADAPTIVE_QUALITY = True
+        config.FRAME_TIME_BUDGET_MS = args.budget_ms
+    if config.ADAPTIVE_QUALITY and config.DETECTION_WORKERS > 1:
+        parser.error("--budget-ms cannot be combined with --workers > 1 "
+                     "(adaptive quality only applies to in-process detection)")
+    if config.STATIC_CACHE_ENABLED and config.DETECTION_WORKERS > 1:
+        parser.error("--static-cache cannot be combined with --workers > 1 "
+                     "(the scene cache only applies to in-process detection)")
 
     print("🎥 Real-Time Person Detection System")
     print("=" * 40)
     print(f"🔍 Detection Method: {config.DETECTION_METHOD}")
-    print(f"📹 Camera Index: {config.CAMERA_INDEX}")
+    print(f"📹 Source: {config.CAMERA_SOURCE if config.CAMERA_SOURCE is not None else config.CAMERA_INDEX}")
     print(f"🖥️  Run Mode: {args.mode.upper()}")
     print("=" * 40)
 
-    if args.mode == 'gui':
-        run_gui()
-    else:
-        run_terminal()
+    if args.profile:
+        start_profiling(args.profile_sample_ms / 1000.0 if args.profile_sample_ms else None)
+    try:
+        if args.mode == 'gui':
+            run_gui()
+        else:
+            run_terminal()
+    finally:
+        if args.profile:
+            stop_profiling(args.profile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
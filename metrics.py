@@ -0,0 +1,108 @@
+import json
+import numpy as np
+from typing import Dict, List, Tuple, Union
+
+
+def load_ground_truth(path: str) -> Dict[Union[int, str], np.ndarray]:
+    """Load ground-truth person boxes from a JSON Lines file
+
+    Each line holds either a video frame index or an image path plus the
+    boxes in (x1, y1, x2, y2) pixel coordinates:
+
+        {"frame": 12, "boxes": [[10, 20, 60, 140]]}
+        {"image": "lobby/0001.jpg", "boxes": []}
+    """
+    ground_truth = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            key = entry['frame'] if 'frame' in entry else entry['image']
+            boxes = np.asarray(entry.get('boxes', []), dtype=np.float32).reshape(-1, 4)
+            ground_truth[key] = boxes
+    return ground_truth
+
+
+def box_iou(boxes_a, boxes_b) -> np.ndarray:
+    """Pairwise IoU matrix between two sets of (x1, y1, x2, y2) boxes"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+def match_detections(detections, ground_truth, iou_threshold: float = 0.5) -> np.ndarray:
+    """Greedily match detections to ground truth, returns a bool mask of true positives
+
+    Detections are expected in descending confidence order; each ground-truth
+    box can be claimed by at most one detection.
+    """
+    iou = box_iou(detections, ground_truth)
+    matched = np.zeros(iou.shape[0], dtype=bool)
+    if iou.size == 0:
+        return matched
+
+    taken = np.zeros(iou.shape[1], dtype=bool)
+    for i in range(iou.shape[0]):
+        candidates = np.where(taken, -1.0, iou[i])
+        j = int(np.argmax(candidates))
+        if candidates[j] >= iou_threshold:
+            matched[i] = True
+            taken[j] = True
+    return matched
+
+
+def count_matches(detections, ground_truth, iou_threshold: float = 0.5) -> Tuple[int, int, int]:
+    """Return (true positives, false positives, false negatives) for one frame"""
+    matched = match_detections(detections, ground_truth, iou_threshold)
+    tp = int(matched.sum())
+    return tp, len(matched) - tp, len(np.asarray(ground_truth).reshape(-1, 4)) - tp
+
+
+def average_precision(scores, true_positives, num_ground_truth: int) -> float:
+    """All-point interpolated average precision over a set of ranked detections"""
+    if num_ground_truth == 0:
+        return 0.0
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
+        return 0.0
+
+    order = np.argsort(-scores, kind='stable')
+    hits = np.asarray(true_positives, dtype=np.float64)[order]
+    tp = np.cumsum(hits)
+    fp = np.cumsum(1.0 - hits)
+    recall = tp / num_ground_truth
+    precision = tp / np.maximum(tp + fp, 1e-9)
+
+    # Make precision monotonically decreasing, then integrate over recall
+    recall = np.concatenate(([0.0], recall, [1.0]))
+    precision = np.concatenate(([0.0], precision, [0.0]))
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    steps = np.where(recall[1:] != recall[:-1])[0]
+    return float(np.sum((recall[steps + 1] - recall[steps]) * precision[steps + 1]))
+
+
+def pareto_front(points: List[Tuple[float, float]]) -> List[int]:
+    """Indices of points not dominated on both axes (higher is better)"""
+    front = []
+    for i, (a, b) in enumerate(points):
+        dominated = any(
+            (c >= a and d >= b) and (c > a or d > b)
+            for j, (c, d) in enumerate(points) if j != i
+        )
+        if not dominated:
+            front.append(i)
+    return front
@@ -1,19 +1,78 @@
 import cv2
 import numpy as np
 import datetime
+import itertools
+import threading
+import time
+from collections import deque
 from typing import Tuple, List, Optional
 import config
+from buffers import BufferPool
+from detection_result import DetectionResult
+from detector_backends import get_backend, register_backend
+from metrics import box_iou
+from profiler import span
+from rolling_stats import RollingStats
 
 class PersonDetector:
     def __init__(self, method="HOG"):
         self.method = method
         self.person_count = 0
-        self.detection_history = []
-
-        if method == "HOG":
-            self.setup_hog()
-        elif method == "YOLO":
-            self.setup_yolo()
+        # Newest results, frame_id doubles as a sequence number for incremental readers
+        self.detection_history = deque(maxlen=config.HISTORY_LENGTH)
+        self.history_lock = threading.Lock()
+        self.frame_index = 0
+        self.last_frame_result = None
+
+        # Minute to day statistics in bounded memory (the history above covers only HISTORY_LENGTH frames)
+        self.rolling_stats = RollingStats()
+
+        # Inference parameters (tunable per camera, see tuning.py)
+        self.hog_win_stride = tuple(config.HOG_WIN_STRIDE)
+        self.hog_padding = tuple(config.HOG_PADDING)
+        self.hog_scale = config.HOG_SCALE
+        self.inference_scale = config.INFERENCE_SCALE
+
+        # Reused per-frame image buffers
+        self.buffers = BufferPool()
+
+        # Detection backend (see detector_backends.py); setup may fall back to another method
+        get_backend(method).setup(self)
+        self.backend = get_backend(self.method)
+
+        # Stable person IDs across frames
+        self.tracker = None
+        if config.TRACKING_ENABLED:
+            from tracking import PersonTracker
+            self.tracker = PersonTracker()
+
+        # Virtual line crossing counts (entries/exits)
+        self.line_counter = None
+        if config.COUNTING_LINES:
+            from counting import LineCrossingCounter
+            self.line_counter = LineCrossingCounter()
+
+        # Occupancy heatmap, created on the first frame once its size is known
+        self.heatmap = None
+
+        # Optional reuse of detections on static scenes
+        self.scene_cache = None
+        if config.STATIC_CACHE_ENABLED:
+            from frame_cache import StaticSceneCache
+            self.scene_cache = StaticSceneCache()
+
+        # Optional frame-time budget controller
+        self.quality_controller = None
+        self.last_result = DetectionResult()
+        if config.ADAPTIVE_QUALITY:
+            self.enable_adaptive_quality()
+
+    def enable_adaptive_quality(self, budget_ms: Optional[float] = None):
+        """Adapt inference scale, stride and detection frequency to a frame-time budget"""
+        from adaptive_quality import AdaptiveQualityController
+        self.quality_controller = AdaptiveQualityController(budget_ms)
+        self.quality_controller.attach(self)
+        print(f"✓ Adaptive quality enabled ({self.quality_controller.budget * 1000:.0f} ms budget)")
 
     def setup_hog(self):
         """Setup HOG descriptor for person detection"""
@@ -33,71 +92,250 @@ class PersonDetector:
             self.method = "HOG"
             self.setup_hog()
 
-    def detect_persons_hog(self, frame: np.ndarray) -> Tuple[List, int]:
+    def setup_cascade(self):
+        """Setup cheap region proposals (HOG or motion) refined by YOLO on crops"""
+        self.cascade_frame_index = 0
+        if config.CASCADE_PROPOSER == "MOTION":
+            self.motion_subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+        else:
+            self.setup_hog()
+        self.setup_yolo()  # Falls back to plain HOG if YOLO is unavailable
+
+    def inference_scale_for(self, frame_shape: Tuple[int, ...], max_side: Optional[int] = None) -> float:
+        """Scale applied before inference, capped so the longest side fits max_side"""
+        scale = self.inference_scale
+        if max_side:
+            scale = min(scale, max_side / max(frame_shape[:2]))
+        return scale
+
+    def prepare_inference_frame(self, frame: np.ndarray, max_side: Optional[int] = None,
+                                pooled: bool = True) -> Tuple[np.ndarray, float]:
+        """Resize frame to the inference resolution, returns (frame, scale)
+
+        pooled=False allocates the result instead of using the buffer pool,
+        for inputs whose size changes every call (cascade crops) and would
+        only churn the pool's per-shape rings.
+        """
+        scale = self.inference_scale_for(frame.shape, max_side)
+        if scale == 1.0:
+            return frame, 1.0
+
+        height, width = frame.shape[:2]
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if not pooled:
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), scale
+        resized = self.buffers.get('inference', (size[1], size[0]) + frame.shape[2:], frame.dtype)
+        return cv2.resize(frame, size, dst=resized, interpolation=cv2.INTER_AREA), scale
+
+    def detect_scaled(self, detect, frame: np.ndarray, max_side: Optional[int] = None,
+                      pooled: bool = True) -> DetectionResult:
+        """Run detect(self, frame) at the inference resolution, boxes in full-frame coordinates"""
+        small_frame, scale = self.prepare_inference_frame(frame, max_side, pooled)
+        result = detect(self, small_frame)
+        return result if scale == 1.0 else result.scaled(1.0 / scale)
+
+    def detect_persons_hog(self, frame: np.ndarray) -> DetectionResult:
         """Detect persons using HOG descriptor"""
         # Detect people in the frame
         boxes, weights = self.hog.detectMultiScale(
-            frame, 
-            winStride=config.HOG_WIN_STRIDE,
-            padding=config.HOG_PADDING,
-            scale=config.HOG_SCALE
+            frame,
+            winStride=self.hog_win_stride,
+            padding=self.hog_padding,
+            scale=self.hog_scale
         )
 
-        # Convert to list of bounding boxes
-        person_boxes = []
-        for (x, y, w, h) in boxes:
-            person_boxes.append((x, y, x + w, y + h))
+        # (x, y, w, h) -> (x1, y1, x2, y2)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        boxes[:, 2:] += boxes[:, :2]
+        return DetectionResult(boxes, np.asarray(weights, dtype=np.float32).ravel())
 
-        return person_boxes, len(person_boxes)
-
-    def detect_persons_yolo(self, frame: np.ndarray) -> Tuple[List, int]:
+    def detect_persons_yolo(self, frame: np.ndarray) -> DetectionResult:
         """Detect persons using YOLO model"""
         try:
             results = self.yolo_model(frame, verbose=False)
-            person_boxes = []
-
-            for r in results:
-                boxes = r.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Check if detected class is 'person' (class 0 in COCO)
-                        if int(box.cls[0]) == 0:  # Person class
-                            coords = box.xyxy[0].tolist()
-                            person_boxes.append(coords)
-
-            return person_boxes, len(person_boxes)
+            return DetectionResult.concatenate(self.yolo_persons(r) for r in results)
         except Exception as e:
             print(f"YOLO detection error: {e}")
-            return [], 0
+            return DetectionResult()
 
-    def detect_persons(self, frame: np.ndarray) -> Tuple[np.ndarray, int]:
+    def detect_persons_yolo_batch(self, frames: List[np.ndarray]) -> List[DetectionResult]:
+        """Detect persons in several frames with one YOLO call"""
+        try:
+            results = self.yolo_model(frames, verbose=False)
+            return [self.yolo_persons(r) for r in results]
+        except Exception as e:
+            print(f"YOLO detection error: {e}")
+            return [DetectionResult() for _ in frames]
+
+    @staticmethod
+    def yolo_persons(r) -> DetectionResult:
+        """Person detections of one ultralytics result"""
+        boxes = r.boxes
+        if boxes is None or not len(boxes):
+            return DetectionResult()
+        # Keep only the 'person' class (class 0 in COCO)
+        class_ids = boxes.cls.cpu().numpy().astype(np.int32)
+        person = class_ids == 0
+        return DetectionResult(boxes.xyxy.cpu().numpy()[person],
+                               boxes.conf.cpu().numpy()[person], class_ids[person])
+
+    def propose_regions(self, frame: np.ndarray) -> np.ndarray:
+        """Cheap first pass for the cascade: candidate person regions as (N, 4) boxes"""
+        if config.CASCADE_PROPOSER != "MOTION":
+            return self.detect_scaled(PersonDetector.detect_persons_hog, frame).boxes.astype(np.int32)
+
+        mask = self.motion_subtractor.apply(frame)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((5, 5), np.uint8))
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        regions = []
+        for contour in contours:
+            if cv2.contourArea(contour) < config.CASCADE_MIN_MOTION_AREA:
+                continue
+            x, y, w, h = cv2.boundingRect(contour)
+            regions.append((x, y, x + w, y + h))
+        return np.asarray(regions, dtype=np.int32).reshape(-1, 4)
+
+    def cascade_crops(self, regions, frame_shape: Tuple[int, ...]) -> List:
+        """Pad proposal regions and merge overlapping ones into crop rectangles"""
+        height, width = frame_shape[:2]
+        crops = []
+        for x1, y1, x2, y2 in regions:
+            pad_x = int((x2 - x1) * config.CASCADE_CROP_PADDING)
+            pad_y = int((y2 - y1) * config.CASCADE_CROP_PADDING)
+            crops.append([max(0, x1 - pad_x), max(0, y1 - pad_y),
+                          min(width, x2 + pad_x), min(height, y2 + pad_y)])
+
+        # Union overlapping crops so each image area is sent to YOLO once
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(crops)):
+                for j in range(i + 1, len(crops)):
+                    a, b = crops[i], crops[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        crops[i] = [min(a[0], b[0]), min(a[1], b[1]),
+                                    max(a[2], b[2]), max(a[3], b[3])]
+                        del crops[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return crops
+
+    def detect_persons_cascade(self, frame: np.ndarray) -> DetectionResult:
+        """Detect persons with YOLO only on regions proposed by a cheap first pass"""
+        if self.method != "CASCADE":
+            # YOLO could not be loaded
+            return self.detect_scaled(PersonDetector.detect_persons_hog, frame)
+
+        # Full frames and crops are each downscaled to the YOLO backend's input size
+        yolo_size = get_backend("YOLO").input_size
+        self.cascade_frame_index += 1
+        if self.cascade_frame_index % config.CASCADE_FULL_FRAME_INTERVAL == 1:
+            # Periodic full-frame pass catches people the proposer missed
+            return self.detect_scaled(PersonDetector.detect_persons_yolo, frame, yolo_size)
+
+        crop_results = []
+        for x1, y1, x2, y2 in self.cascade_crops(self.propose_regions(frame), frame.shape):
+            if x2 - x1 < config.CASCADE_MIN_CROP or y2 - y1 < config.CASCADE_MIN_CROP:
+                continue
+            crop = frame[y1:y2, x1:x2]
+            crop_results.append(self.detect_scaled(PersonDetector.detect_persons_yolo, crop, yolo_size, pooled=False)
+                                .translated(x1, y1))
+
+        # Drop duplicates found again in a neighbouring crop, keeping the most confident
+        result = DetectionResult.concatenate(crop_results).sorted_by_score()
+        iou = box_iou(result.boxes, result.boxes)
+        keep = np.ones(len(result), dtype=bool)
+        for i in range(len(result)):
+            if keep[i]:
+                keep[i + 1:] &= iou[i, i + 1:] <= 0.5
+        return result.select(keep)
+
+    def detect_persons(self, frame: np.ndarray, timestamp: Optional[float] = None) -> Tuple[np.ndarray, int]:
         """Main detection method that returns annotated frame and person count"""
-        if self.method == "HOG":
-            boxes, count = self.detect_persons_hog(frame)
+        controller = self.quality_controller
+        cached = self.scene_cache.lookup(frame) if self.scene_cache is not None else None
+        if cached is not None:
+            # Scene unchanged: reuse the detections of the matching frame
+            result = cached
+        elif controller is not None and not controller.should_detect():
+            # Skipped frame under load: reuse the last detections
+            result = self.last_result
         else:
-            boxes, count = self.detect_persons_yolo(frame)
+            start = time.perf_counter()
+            with span('detect'):
+                result = self.detect_boxes(frame)
+            self.last_result = result
+            if self.scene_cache is not None:
+                self.scene_cache.store(result)
+
+            if controller is not None and controller.record(time.perf_counter() - start):
+                print(f"⚙️ Adaptive quality: {controller.describe()}")
+
+        return self.apply_detections(frame, result, timestamp)
+
+    def detect_boxes(self, frame: np.ndarray) -> DetectionResult:
+        """Run the configured detection method without updating state
+
+        Frames are downscaled to the inference scale, capped at the backend's
+        input_size, and the boxes are mapped back to frame coordinates.
+        """
+        return self.detect_scaled(self.backend.detect, frame, self.backend.input_size)
+
+    def detect_boxes_batch(self, frames: List[np.ndarray]) -> List[DetectionResult]:
+        """detect_boxes for several frames, in one call if the backend supports batching"""
+        if not self.backend.supports_batch:
+            return [self.detect_boxes(frame) for frame in frames]
+
+        scales = [self.inference_scale_for(frame.shape, self.backend.input_size) for frame in frames]
+        # Not resized into the buffer pool: a batch can hold more frames than its ring
+        inputs = [frame if scale == 1.0 else
+                  cv2.resize(frame, (max(1, int(frame.shape[1] * scale)), max(1, int(frame.shape[0] * scale))),
+                             interpolation=cv2.INTER_AREA)
+                  for frame, scale in zip(frames, scales)]
+        results = self.backend.detect_batch(self, inputs)
+        return [result if scale == 1.0 else result.scaled(1.0 / scale)
+                for result, scale in zip(results, scales)]
+
+    def apply_detections(self, frame: np.ndarray, result: DetectionResult,
+                         timestamp: Optional[float] = None) -> Tuple[np.ndarray, int]:
+        """Record detections computed elsewhere (e.g. by worker processes) and annotate the frame"""
+        # Results may be reused across frames, so give this frame its own record
+        self.frame_index += 1
+        result = result.with_frame(self.frame_index, timestamp)
+        count = len(result)
+
+        with span('track'):
+            if self.tracker is not None:
+                result.track_ids = self.tracker.update(result.boxes)
+            if self.line_counter is not None:
+                self.line_counter.update(result.boxes)
+            if config.HEATMAP_ENABLED:
+                if self.heatmap is None:
+                    from heatmap import OccupancyHeatmap
+                    self.heatmap = OccupancyHeatmap(frame.shape)
+                self.heatmap.update(result.boxes)
+                self.heatmap.maybe_export()
 
         # Update person count and history
         self.person_count = count
-        current_time = datetime.datetime.now()
-        self.detection_history.append({
-            'time': current_time,
-            'count': count,
-            'boxes': boxes
-        })
-
-        # Keep only last 10 entries
-        if len(self.detection_history) > 10:
-            self.detection_history.pop(0)
+        self.rolling_stats.update(count, result.timestamp)
+        self.last_frame_result = result
+        with self.history_lock:
+            self.detection_history.append(result)
 
         # Draw bounding boxes and annotations
-        annotated_frame = self.draw_detections(frame, boxes, count)
+        with span('annotate'):
+            annotated_frame = self.draw_detections(frame, result.boxes, count, result.track_ids)
 
         return annotated_frame, count
 
-    def draw_detections(self, frame: np.ndarray, boxes: List, count: int) -> np.ndarray:
+    def draw_detections(self, frame: np.ndarray, boxes, count: int,
+                        track_ids: Optional[List[int]] = None) -> np.ndarray:
         """Draw bounding boxes and information on frame"""
-        annotated_frame = frame.copy()
+        annotated_frame = self.buffers.get('annotated', frame.shape, frame.dtype)
+        np.copyto(annotated_frame, frame)
 
         # Draw bounding boxes around detected persons
         for i, box in enumerate(boxes):
@@ -107,13 +345,21 @@ class PersonDetector:
             cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), config.BBOX_COLOR, 2)
 
             # Add person label
-            label = f'Person {i+1}'
+            label = f'Person {track_ids[i] if track_ids is not None else i+1}'
             label_size, _ = cv2.getTextSize(label, config.FONT, 0.5, 1)
             cv2.rectangle(annotated_frame, (x1, y1-label_size[1]-10), 
                          (x1+label_size[0], y1), config.BBOX_COLOR, -1)
             cv2.putText(annotated_frame, label, (x1, y1-5), 
                        config.FONT, 0.5, (0, 0, 0), 1)
 
+        # Draw counting lines with their totals
+        if self.line_counter is not None:
+            for line in self.line_counter.lines:
+                start = tuple(map(int, line.start))
+                cv2.line(annotated_frame, start, tuple(map(int, line.end)), config.LINE_COLOR, 2)
+                cv2.putText(annotated_frame, f'{line.name}: in {line.count_in} / out {line.count_out}',
+                           (start[0] + 5, start[1] - 5), config.FONT, 0.5, config.LINE_COLOR, 1)
+
         # Add current date and time (top left)
         current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         cv2.putText(annotated_frame, current_time, (10, 30), 
@@ -131,60 +377,132 @@ class PersonDetector:
 
         return annotated_frame
 
-    def get_detection_history(self) -> List[dict]:
+    def get_detection_history(self) -> List[DetectionResult]:
         """Get recent detection history"""
-        return self.detection_history[-5:]  # Last 5 entries
+        with self.history_lock:
+            return list(itertools.islice(reversed(self.detection_history), 5))[::-1]  # Last 5 entries
+
+    def get_history_since(self, frame_id: int, limit: Optional[int] = None) -> List[DetectionResult]:
+        """Stored results newer than frame_id, oldest first (at most the newest limit entries)
+
+        Cost is proportional to the number of returned entries, not the history length.
+        """
+        new = []
+        with self.history_lock:
+            for entry in reversed(self.detection_history):
+                if entry.frame_id <= frame_id or (limit is not None and len(new) >= limit):
+                    break
+                new.append(entry)
+        return new[::-1]
 
     def get_current_stats(self) -> dict:
         """Get current detection statistics"""
         if not self.detection_history:
-            return {'current_count': 0, 'avg_count': 0, 'max_count': 0}
+            return {'current_count': 0, 'avg_count': 0, 'max_count': 0,
+                    'windows': self.rolling_stats.summaries()}
 
-        recent_counts = [entry['count'] for entry in self.detection_history[-10:]]
+        with self.history_lock:
+            recent_counts = [len(entry) for entry in itertools.islice(reversed(self.detection_history), 10)]
 
-        return {
+        stats = {
             'current_count': self.person_count,
             'avg_count': round(np.mean(recent_counts), 1),
             'max_count': max(recent_counts)
         }
+        if self.tracker is not None:
+            stats['unique_persons'] = self.tracker.unique_persons
+        if self.line_counter is not None:
+            stats['line_counts'] = self.line_counter.totals()
+        if self.scene_cache is not None:
+            stats['cache_hit_rate'] = round(self.scene_cache.hit_rate, 3)
+        if self.quality_controller is not None:
+            stats['quality_level'] = self.quality_controller.level
+        stats['windows'] = self.rolling_stats.summaries()
+        return stats
+
+
+# Built-in detection methods, more can be added with detector_backends.register_backend
+register_backend("HOG", PersonDetector.setup_hog, PersonDetector.detect_persons_hog)
+register_backend("YOLO", PersonDetector.setup_yolo, PersonDetector.detect_persons_yolo,
+                 detect_batch=PersonDetector.detect_persons_yolo_batch, batch_size=config.YOLO_BATCH_SIZE,
+                 input_size=config.YOLO_INPUT_SIZE, warmup_frames=1,
+                 max_workers=1)  # PyTorch already spreads one inference over all cores
+# The cascade scales its proposal, full-frame and crop passes itself
+register_backend("CASCADE", PersonDetector.setup_cascade, PersonDetector.detect_persons_cascade,
+                 warmup_frames=1, max_workers=1)
 
 
 class CameraManager:
-    def __init__(self, camera_index=0):
-        self.camera_index = camera_index
-        self.cap = None
+    def __init__(self, source=None, backend: Optional[str] = None, record_path: Optional[str] = None):
+        # Device index, video file, image folder or stream URL (see frame_sources.py)
+        self.source_spec = source if source is not None else config.CAMERA_INDEX
+        self.backend = backend
+        self.source = None
         self.is_active = False
+        self.last_timestamp = None
+
+        # Raw frames and capture timestamps are recorded here for replay (see recording.py)
+        self.record_path = record_path if record_path is not None else config.RECORD_PATH
 
     def start_camera(self) -> bool:
         """Start the camera capture"""
-        self.cap = cv2.VideoCapture(self.camera_index)
-        if not self.cap.isOpened():
-            print(f"Error: Cannot open camera {self.camera_index}")
+        if self.source is not None and not self.is_active:
+            # Fast path: the device was kept open by stop_camera()
+            self.source.resume()
+            self.is_active = True
+            print(f"✓ Source {self.source.name} resumed")
+            return True
+
+        from frame_sources import open_source, ThreadedSource
+        self.source = open_source(self.source_spec, self.backend, threaded=False)
+        if self.record_path:
+            # Record on the capture side so frames a slow consumer skips are kept too
+            from recording import RecordingSource
+            self.source = RecordingSource(self.source, self.record_path)
+            print(f"⏺ Recording raw frames to {self.record_path}")
+        if config.THREADED_CAPTURE:
+            self.source = ThreadedSource(self.source)
+
+        if not self.source.open():
+            print(f"Error: Cannot open source {self.source_spec}")
+            self.source = None
             return False
 
-        # Set camera properties
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.CAMERA_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.CAMERA_HEIGHT)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
-
         self.is_active = True
-        print(f"✓ Camera {self.camera_index} started")
+        print(f"✓ Source {self.source.name} started")
         return True
 
     def read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
         """Read a frame from camera"""
-        if not self.is_active or self.cap is None:
-            return False, None
-
-        ret, frame = self.cap.read()
+        ret, frame, _ = self.read_frame_timestamped()
         return ret, frame
 
-    def stop_camera(self):
-        """Stop camera capture and release resources"""
-        if self.cap:
-            self.cap.release()
+    def read_frame_timestamped(self) -> Tuple[bool, Optional[np.ndarray], Optional[float]]:
+        """Read a frame together with its capture timestamp (time.time())"""
+        if not self.is_active or self.source is None:
+            return False, None, None
+
+        with span('capture'):
+            ret, frame, timestamp = self.source.read()
+        self.last_timestamp = timestamp
+        return ret, frame, timestamp
+
+    def stop_camera(self, keep_warm: Optional[bool] = None):
+        """Stop camera capture; camera devices stay open (paused) unless keep_warm is False"""
+        if keep_warm is None:
+            keep_warm = config.CAMERA_KEEP_WARM
+        if self.source is not None and keep_warm and self.source.can_pause:
+            if self.is_active:
+                self.source.pause()
+                self.is_active = False
+                print("✓ Camera paused (kept open for a fast restart)")
+            return
+
+        if self.source:
+            self.source.close()
+            self.source = None
         self.is_active = False
         print("✓ Camera stopped")
 
     def __del__(self):
-        self.stop_camera()
\ No newline at end of file
+        self.stop_camera(keep_warm=False)
@@ -0,0 +1,221 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import config
+
+_tracer = None
+
+
+class Tracer:
+    """Records named spans per thread and, optionally, sampled Python stacks
+
+    Spans and samples are kept in memory (at most PROFILE_MAX_EVENTS each)
+    and written on save() as a Chrome trace (chrome://tracing, Perfetto) or,
+    for paths ending in .speedscope.json, a speedscope file. Sampled stacks
+    are merged into nested slices per thread so they line up with the spans
+    on the same timeline.
+    """
+
+    def __init__(self, sample_interval: Optional[float] = None, max_events: int = None):
+        self.origin = time.perf_counter_ns()
+        self.max_events = max_events or config.PROFILE_MAX_EVENTS
+        self.spans: List[Tuple[str, int, int, int, Optional[dict]]] = []  # name, start ns, end ns, tid, args
+        self.samples: List[Tuple[int, int, Tuple[str, ...]]] = []  # time ns, tid, stack root first
+        self.thread_names: Dict[int, str] = {}
+        self.dropped = 0
+
+        self.sample_interval = sample_interval
+        self.sampler = None
+        self.running = False
+        if sample_interval:
+            self.running = True
+            self.sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+            self.sampler.start()
+
+    def now(self) -> int:
+        return time.perf_counter_ns() - self.origin
+
+    def record(self, name: str, start: int, end: int, args: Optional[dict] = None):
+        if len(self.spans) >= self.max_events:
+            self.dropped += 1
+            return
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.spans.append((name, start, end, tid, args))
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while self.running:
+            timestamp = self.now()
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < 64:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if len(self.samples) >= self.max_events:
+                    self.dropped += 1
+                    continue
+                self.samples.append((timestamp, tid, tuple(reversed(stack))))
+            time.sleep(self.sample_interval)
+
+    def stop(self):
+        self.running = False
+        if self.sampler is not None:
+            self.sampler.join(timeout=1)
+            self.sampler = None
+        for thread in threading.enumerate():
+            self.thread_names.setdefault(thread.ident, thread.name)
+
+    def sample_slices(self) -> List[Tuple[str, int, int, int]]:
+        """Sampled stacks as nested (name, start ns, end ns, tid) slices, one level per frame"""
+        by_thread: Dict[int, List[Tuple[int, Tuple[str, ...]]]] = {}
+        for timestamp, tid, stack in self.samples:
+            by_thread.setdefault(tid, []).append((timestamp, stack))
+
+        slices = []
+        for tid, samples in by_thread.items():
+            open_frames: List[Tuple[str, int]] = []
+            for timestamp, stack in samples:
+                common = 0
+                while (common < len(open_frames) and common < len(stack)
+                       and open_frames[common][0] == stack[common]):
+                    common += 1
+                for name, start in reversed(open_frames[common:]):
+                    slices.append((name, start, timestamp, tid))
+                del open_frames[common:]
+                open_frames.extend((name, timestamp) for name in stack[common:])
+            end = samples[-1][0] + int((self.sample_interval or 0) * 1e9)
+            for name, start in reversed(open_frames):
+                slices.append((name, start, end, tid))
+        return slices
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        sample_pid = pid + 1 if self.samples else None  # Separate track group for sampled stacks
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'spans'}}]
+        if sample_pid is not None:
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': sample_pid, 'args': {'name': 'sampled stacks'}})
+        for tid, name in self.thread_names.items():
+            for p in (pid, sample_pid):
+                if p is not None:
+                    events.append({'name': 'thread_name', 'ph': 'M', 'pid': p, 'tid': tid, 'args': {'name': name}})
+
+        for name, start, end, tid, args in self.spans:
+            event = {'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                     'ts': start / 1000, 'dur': (end - start) / 1000}
+            if args:
+                event['args'] = args
+            events.append(event)
+        for name, start, end, tid in self.sample_slices():
+            events.append({'name': name, 'ph': 'X', 'pid': sample_pid, 'tid': tid,
+                           'ts': start / 1000, 'dur': (end - start) / 1000})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def speedscope(self) -> dict:
+        frames: List[dict] = []
+        frame_index: Dict[str, int] = {}
+
+        def index(name: str) -> int:
+            if name not in frame_index:
+                frame_index[name] = len(frames)
+                frames.append({'name': name})
+            return frame_index[name]
+
+        profiles = []
+        for tid, thread_name in self.thread_names.items():
+            spans = [s for s in self.spans if s[3] == tid]
+            if spans:
+                # Open/close events ordered so nested spans close before their parents
+                keyed = []
+                for name, start, end, _, _ in spans:
+                    keyed.append(((start, 1, start - end), {'type': 'O', 'frame': index(name), 'at': start / 1000}))
+                    keyed.append(((end, 0, end - start), {'type': 'C', 'frame': index(name), 'at': end / 1000}))
+                keyed.sort(key=lambda item: item[0])
+                profiles.append({
+                    'type': 'evented', 'name': f"{thread_name} spans", 'unit': 'microseconds',
+                    'startValue': min(s[1] for s in spans) / 1000, 'endValue': max(s[2] for s in spans) / 1000,
+                    'events': [event for _, event in keyed],
+                })
+
+            samples = [s for s in self.samples if s[1] == tid]
+            if samples:
+                weight = (self.sample_interval or 0) * 1e6
+                profiles.append({
+                    'type': 'sampled', 'name': f"{thread_name} samples", 'unit': 'microseconds',
+                    'startValue': samples[0][0] / 1000, 'endValue': samples[-1][0] / 1000 + weight,
+                    'samples': [[index(name) for name in stack] for _, _, stack in samples],
+                    'weights': [weight] * len(samples),
+                })
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': profiles,
+            'name': 'person detection profile',
+            'exporter': 'profiler.py',
+        }
+
+    def save(self, path: str) -> str:
+        self.stop()
+        data = self.speedscope() if path.endswith('.speedscope.json') else self.chrome_trace()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return path
+
+
+@contextmanager
+def _span(tracer: Tracer, name: str, args: Optional[dict]):
+    start = tracer.now()
+    try:
+        yield
+    finally:
+        tracer.record(name, start, tracer.now(), args)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **args):
+    """Context manager timing a block as a named span (no-op unless profiling)"""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _span(tracer, name, args or None)
+
+
+def start_profiling(sample_interval: Optional[float] = None) -> Tracer:
+    """Start recording spans (and stack samples every sample_interval seconds)"""
+    global _tracer
+    _tracer = Tracer(sample_interval)
+    return _tracer
+
+
+def stop_profiling(path: str) -> Optional[str]:
+    """Stop recording and write the trace, returns the path written"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return None
+    tracer.save(path)
+    dropped = f", {tracer.dropped} events dropped" if tracer.dropped else ""
+    print(f"📈 Profile saved: {path} ({len(tracer.spans)} spans, {len(tracer.samples)} samples{dropped})")
+    return path
@@ -0,0 +1,204 @@
+import os
+import struct
+import time
+import numpy as np
+from typing import Optional, Tuple
+from urllib.parse import parse_qs
+import config
+from frame_sources import FrameSource, register_source_scheme
+
+# File layout: 64-byte header, float64 capture timestamps for every slot,
+# then the raw uint8 frames (height x width x channels each), 64-byte aligned.
+MAGIC = b'PCREC001'
+HEADER_FORMAT = '<8sIIIII'  # magic, width, height, channels, capacity, count
+HEADER_SIZE = 64
+
+
+def _frames_offset(capacity: int) -> int:
+    return (HEADER_SIZE + 8 * capacity + 63) // 64 * 64
+
+
+def read_header(path: str) -> dict:
+    """Frame geometry and count of a recording"""
+    with open(path, 'rb') as f:
+        data = f.read(struct.calcsize(HEADER_FORMAT))
+    if len(data) < struct.calcsize(HEADER_FORMAT):
+        raise ValueError(f"{path} is not a frame recording")
+    magic, width, height, channels, capacity, count = struct.unpack(HEADER_FORMAT, data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a frame recording")
+    return {'width': width, 'height': height, 'channels': channels,
+            'capacity': capacity, 'count': count}
+
+
+class FrameRecorder:
+    """Writes raw frames and their capture timestamps into a memory-mapped file
+
+    The file is sized for ``max_frames`` frames when the first frame arrives
+    (sparse on most file systems) and trimmed to the recorded frames on
+    close. The frame count in the header is updated after every frame, so a
+    recording interrupted by a crash can still be replayed.
+    """
+
+    def __init__(self, path: str, max_frames: int = None):
+        self.path = path
+        self.max_frames = max_frames or config.RECORD_MAX_FRAMES
+        self.mm = None
+        self.frames = None
+        self.timestamps = None
+        self.shape = None
+        self.count = 0
+        self.full = False
+
+    def _create(self, shape: Tuple[int, ...]):
+        height, width = shape[:2]
+        channels = shape[2] if len(shape) == 3 else 1
+        self.shape = shape
+        offset = _frames_offset(self.max_frames)
+        size = offset + self.max_frames * height * width * channels
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.mm = np.memmap(self.path, dtype=np.uint8, mode='w+', shape=(size,))
+        struct.pack_into(HEADER_FORMAT, self.mm, 0, MAGIC, width, height, channels, self.max_frames, 0)
+        self.timestamps = np.ndarray((self.max_frames,), dtype=np.float64, buffer=self.mm, offset=HEADER_SIZE)
+        self.frames = np.ndarray((self.max_frames,) + tuple(shape), dtype=np.uint8,
+                                 buffer=self.mm, offset=offset)
+
+    def write(self, frame: np.ndarray, timestamp: float) -> bool:
+        """Append one frame, returns False once the recording is full or the frame does not fit"""
+        if self.mm is None:
+            self._create(frame.shape)
+        if frame.shape != self.shape or frame.dtype != np.uint8:
+            print(f"⚠ Frame {frame.shape} does not match recording {self.shape}, not recorded")
+            return False
+        if self.count >= self.max_frames:
+            if not self.full:
+                print(f"⚠ Recording full ({self.max_frames} frames), further frames not recorded")
+                self.full = True
+            return False
+
+        self.frames[self.count] = frame
+        self.timestamps[self.count] = timestamp
+        self.count += 1
+        struct.pack_into('<I', self.mm, struct.calcsize(HEADER_FORMAT) - 4, self.count)
+        return True
+
+    def close(self):
+        """Flush and trim the file to the recorded frames"""
+        if self.mm is None:
+            return
+        self.mm.flush()
+        used = _frames_offset(self.max_frames) + self.count * self.frames[0].nbytes
+        self.mm = self.frames = self.timestamps = None
+        os.truncate(self.path, used)
+        print(f"💾 Recorded {self.count} frames: {self.path}")
+
+
+class RecordingSource(FrameSource):
+    """Passes frames of another source through while recording them"""
+
+    def __init__(self, source: FrameSource, path: str, max_frames: int = None):
+        self.source = source
+        self.name = source.name
+        self.is_live = source.is_live
+        self.can_pause = source.can_pause
+        self.recorder = FrameRecorder(path, max_frames)
+
+    def open(self) -> bool:
+        return self.source.open()
+
+    def pause(self):
+        self.source.pause()
+
+    def resume(self):
+        self.source.resume()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        ret, frame, timestamp = self.source.read()
+        if ret:
+            self.recorder.write(frame, timestamp)
+        return ret, frame, timestamp
+
+    def close(self):
+        self.source.close()
+        self.recorder.close()
+
+
+class ReplaySource(FrameSource):
+    """Plays a FrameRecorder file back at the original timing or as fast as possible
+
+    In real-time mode frames are released at the recorded inter-frame
+    intervals and the source behaves like a live camera (a slow consumer
+    drops frames); in fast mode every frame is delivered, in order, without
+    waiting, which makes benchmark runs repeatable.
+    """
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.is_live = realtime
+        self.name = f"replay {path}" + ('' if realtime else ' (fast)')
+        self.frames = None
+        self.timestamps = None
+        self.index = 0
+        self.start_time = None
+        self.recorded_timestamp = None  # Original capture time of the last frame read
+
+    def open(self) -> bool:
+        try:
+            header = read_header(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return False
+        if header['count'] == 0:
+            return False
+
+        shape = (header['count'], header['height'], header['width'])
+        if header['channels'] > 1:
+            shape += (header['channels'],)
+        self.timestamps = np.memmap(self.path, dtype=np.float64, mode='r',
+                                    shape=(header['count'],), offset=HEADER_SIZE)
+        self.frames = np.memmap(self.path, dtype=np.uint8, mode='r', shape=shape,
+                                offset=_frames_offset(header['capacity']))
+        self.index = 0
+        self.start_time = None
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        if self.frames is None:
+            return False, None, time.time()
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return False, None, time.time()
+            self.index = 0
+            self.start_time = None
+
+        if self.realtime:
+            if self.start_time is None:
+                self.start_time = time.time()
+            due = self.start_time + float(self.timestamps[self.index] - self.timestamps[0])
+            delay = due - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        # Copy out of the read-only map so consumers may modify the frame
+        frame = np.array(self.frames[self.index])
+        self.recorded_timestamp = float(self.timestamps[self.index])
+        self.index += 1
+        return True, frame, time.time()
+
+    def close(self):
+        self.frames = self.timestamps = None
+
+
+def replay_from_spec(spec: str) -> ReplaySource:
+    """Build a ReplaySource from "replay://path[?fast][&loop]" """
+    path, _, query = spec.split('://', 1)[1].partition('?')
+    options = parse_qs(query, keep_blank_values=True)
+    return ReplaySource(path, realtime='fast' not in options, loop='loop' in options)
+
+
+register_source_scheme('replay', replay_from_spec)
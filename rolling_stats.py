@@ -0,0 +1,161 @@
+import threading
+import time
+import numpy as np
+from typing import Dict, Optional
+import config
+
+
+class RollingWindow:
+    """Person count statistics over a sliding time window
+
+    The window is split into a ring of equal buckets. Each bucket keeps the
+    frame count, count sum, maximum, occupied time and a histogram of person
+    counts, and the window keeps running totals of all of them. When time
+    moves past a bucket its contribution is subtracted and the bucket is
+    reused, so memory is fixed and a query only touches the bucket ring and
+    histogram, never the samples. The buckets double as the window's
+    downsampled time series.
+    """
+
+    def __init__(self, duration: float, buckets: int, max_count: int = None):
+        self.duration = duration
+        self.num_buckets = buckets
+        self.bucket_seconds = duration / buckets
+        self.max_count = max_count or config.STATS_MAX_COUNT
+
+        self.frames = np.zeros(buckets, dtype=np.int64)
+        self.sums = np.zeros(buckets, dtype=np.int64)
+        self.maxima = np.zeros(buckets, dtype=np.int64)
+        self.occupied = np.zeros(buckets, dtype=np.float64)
+        self.observed = np.zeros(buckets, dtype=np.float64)
+        self.histograms = np.zeros((buckets, self.max_count + 1), dtype=np.int64)
+
+        self.total_frames = 0
+        self.total_sum = 0
+        self.total_occupied = 0.0
+        self.total_observed = 0.0
+        self.total_histogram = np.zeros(self.max_count + 1, dtype=np.int64)
+        self.current = None  # Absolute index of the newest bucket
+
+    def advance(self, timestamp: float):
+        """Expire buckets that fell out of the window at this time"""
+        index = int(timestamp // self.bucket_seconds)
+        if self.current is None:
+            self.current = index
+            return
+        if index <= self.current:
+            return
+
+        for absolute in range(self.current + 1, self.current + 1 + min(index - self.current, self.num_buckets)):
+            b = absolute % self.num_buckets
+            self.total_frames -= self.frames[b]
+            self.total_sum -= self.sums[b]
+            self.total_occupied -= self.occupied[b]
+            self.total_observed -= self.observed[b]
+            self.total_histogram -= self.histograms[b]
+            self.frames[b] = self.sums[b] = self.maxima[b] = 0
+            self.occupied[b] = self.observed[b] = 0.0
+            self.histograms[b] = 0
+        if not self.total_frames:
+            # Drop accumulated floating point error once the window is empty
+            self.total_occupied = self.total_observed = 0.0
+        self.current = index
+
+    def add(self, count: int, timestamp: float, duration: float, occupied: float):
+        """Add one frame's count, with the seconds observed and occupied since the previous frame"""
+        self.advance(timestamp)
+        b = self.current % self.num_buckets
+
+        self.frames[b] += 1
+        self.sums[b] += count
+        self.maxima[b] = max(self.maxima[b], count)
+        self.occupied[b] += occupied
+        self.observed[b] += duration
+        self.histograms[b, min(count, self.max_count)] += 1
+
+        self.total_frames += 1
+        self.total_sum += count
+        self.total_occupied += occupied
+        self.total_observed += duration
+        self.total_histogram[min(count, self.max_count)] += 1
+
+    def percentile(self, q: float) -> int:
+        """Person count at percentile q (0-100) from the window histogram"""
+        if not self.total_frames:
+            return 0
+        cumulative = np.cumsum(self.total_histogram)
+        return int(np.searchsorted(cumulative, q / 100.0 * self.total_frames))
+
+    def summary(self, now: Optional[float] = None) -> dict:
+        """Mean, max, percentiles and occupancy over the window"""
+        self.advance(now if now is not None else time.time())
+        if not self.total_frames:
+            return {'frames': 0, 'mean': 0, 'max': 0, 'p50': 0, 'p95': 0,
+                    'occupied_seconds': 0.0, 'occupancy': 0.0}
+        return {
+            'frames': int(self.total_frames),
+            'mean': round(self.total_sum / self.total_frames, 2),
+            'max': int(self.maxima.max()),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'occupied_seconds': round(self.total_occupied, 1),
+            'occupancy': round(self.total_occupied / self.total_observed, 3) if self.total_observed else 0.0,
+        }
+
+    def series(self, now: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Downsampled series, oldest bucket first: bucket start times, mean and max count"""
+        self.advance(now if now is not None else time.time())
+        if self.current is None:
+            empty = np.zeros(0)
+            return {'start': empty, 'mean': empty, 'max': empty}
+
+        absolute = np.arange(self.current - self.num_buckets + 1, self.current + 1)
+        order = absolute % self.num_buckets
+        frames = self.frames[order]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(frames > 0, self.sums[order] / np.maximum(frames, 1), np.nan)
+        maxima = np.where(frames > 0, self.maxima[order], np.nan)
+        return {'start': absolute * self.bucket_seconds, 'mean': mean, 'max': maxima}
+
+
+class RollingStats:
+    """Person count statistics over several time horizons (see config.STATS_WINDOWS)
+
+    Safe to update from the detection thread while another thread queries it.
+    """
+
+    def __init__(self, windows: Dict[str, tuple] = None):
+        windows = windows or config.STATS_WINDOWS
+        self.windows = {name: RollingWindow(duration, buckets)
+                        for name, (duration, buckets) in windows.items()}
+        self.last_timestamp = None
+        self.last_count = 0
+        self.lock = threading.Lock()
+
+    def update(self, count: int, timestamp: Optional[float] = None):
+        """Add the person count of one frame"""
+        timestamp = timestamp if timestamp is not None else time.time()
+        # A frame's count holds until the next frame, long gaps (e.g. pauses) are capped
+        duration = 0.0
+        if self.last_timestamp is not None:
+            duration = min(max(timestamp - self.last_timestamp, 0.0), config.STATS_MAX_GAP)
+        occupied = duration if self.last_count > 0 else 0.0
+        self.last_timestamp = timestamp
+        self.last_count = count
+
+        with self.lock:
+            for window in self.windows.values():
+                window.add(count, timestamp, duration, occupied)
+
+    def summary(self, name: str, now: Optional[float] = None) -> dict:
+        with self.lock:
+            return self.windows[name].summary(now)
+
+    def summaries(self, now: Optional[float] = None) -> Dict[str, dict]:
+        now = now if now is not None else time.time()
+        with self.lock:
+            return {name: window.summary(now) for name, window in self.windows.items()}
+
+    def series(self, name: str, now: Optional[float] = None) -> Dict[str, np.ndarray]:
+        with self.lock:
+            return self.windows[name].series(now)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Soak Test
+=========
+
+Drives the detection pipeline as fast as the source allows for a fixed
+number of frames and watches memory. Detections are stamped with a
+simulated clock (--sim-fps), so rolling statistics, history and charts age
+as they would over days of real operation while the run takes minutes.
+
+Every --sample-every frames the process RSS and the tracemalloc total are
+sampled and the allocation sites that grew most since warm-up are listed.
+The run fails (exit code 1) if either grew past its threshold.
+
+Usage:
+    python soak.py --source "replay://captures/lobby.rec?fast&loop" --frames 200000
+    python soak.py --source lobby.mp4 --frames 5000 --max-growth-mb 20 --report soak.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import cv2
+from typing import List, Optional
+import config
+from api_server import SnapshotCache
+from buffers import BufferPool
+from charts import TimeSeries, decimate_minmax
+from detector_backends import backend_names
+from latency import LatencyTracker
+from person_detection import PersonDetector, CameraManager
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (peak RSS where the current value is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def _mb(size: Optional[int], sign: bool = False) -> str:
+    if size is None:
+        return "n/a"
+    return f"{size / 1e6:+.1f} MB" if sign else f"{size / 1e6:.1f} MB"
+
+
+class MemoryMonitor:
+    """RSS and tracemalloc samples relative to a baseline taken after warm-up"""
+
+    def __init__(self, trace: bool = True, frames: int = None):
+        self.trace = trace
+        self.frames = frames or config.SOAK_TRACE_FRAMES
+        self.samples: List[dict] = []
+        self.baseline = None
+        self.baseline_rss = None
+        self.baseline_traced = 0
+        if self.trace:
+            tracemalloc.start(self.frames)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    def set_baseline(self):
+        self.baseline_rss = current_rss()
+        if self.trace:
+            self.baseline = self._snapshot()
+            self.baseline_traced = tracemalloc.get_traced_memory()[0]
+
+    def top_growth(self, limit: int) -> List[dict]:
+        """Allocation sites whose live size grew most since the baseline"""
+        if not self.trace or self.baseline is None:
+            return []
+        stats = self._snapshot().compare_to(self.baseline, 'lineno')
+        growth = []
+        for stat in stats[:limit]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            growth.append({'site': f"{frame.filename}:{frame.lineno}",
+                           'size_diff': stat.size_diff, 'count_diff': stat.count_diff})
+        return growth
+
+    def sample(self, frame_count: int, top: int = 0) -> dict:
+        rss = current_rss()
+        sample = {
+            'frame': frame_count,
+            'time': time.time(),
+            'rss': rss,
+            'rss_growth': rss - self.baseline_rss if rss is not None and self.baseline_rss is not None else None,
+        }
+        if self.trace:
+            traced = tracemalloc.get_traced_memory()[0]
+            sample['traced'] = traced
+            sample['traced_growth'] = traced - self.baseline_traced
+            sample['top'] = self.top_growth(top) if top else []
+        self.samples.append(sample)
+        return sample
+
+    def stop(self):
+        if self.trace:
+            tracemalloc.stop()
+
+
+def run_soak(source, frames: int, warmup: int, sample_every: int, sim_fps: float,
+             monitor: MemoryMonitor, top: int) -> dict:
+    """Run the pipeline for `frames` frames, returns a report with the memory samples"""
+    detector = PersonDetector(method=config.DETECTION_METHOD)
+    camera = CameraManager(source)
+    if not camera.start_camera():
+        raise IOError(f"Cannot open source {source}")
+
+    pool = None
+    if config.DETECTION_WORKERS > 1:
+        from worker_pool import SharedMemoryDetectorPool
+        pool = SharedMemoryDetectorPool(detector)
+
+    # The per-frame work of the GUI and API, minus the Tk widgets themselves
+    latency = LatencyTracker()
+    buffers = BufferPool()
+    cache = SnapshotCache()
+    count_series = TimeSeries()
+    latency_series = TimeSeries()
+    history_seq = 0
+    start_clock = time.time()
+
+    frame_count = 0
+    started = time.perf_counter()
+    try:
+        while frame_count < frames:
+            if pool is None:
+                ret, frame, timestamp = camera.read_frame_timestamped()
+            else:
+                ret, frame, result = pool.process(camera.read_frame_timestamped)
+                timestamp = result.timestamp if ret else None
+            if not ret:
+                print(f"⚠ Source ended after {frame_count} frames (use a looping source for long runs)")
+                break
+
+            clock = start_clock + frame_count / sim_fps if sim_fps else timestamp
+            if pool is None:
+                annotated_frame, _ = detector.detect_persons(frame, clock)
+            else:
+                annotated_frame, _ = detector.apply_detections(frame, result, clock)
+            lag = latency.record(timestamp)
+
+            display = buffers.get('display', (480, 640, 3))
+            cv2.resize(annotated_frame, (640, 480), dst=display)
+            display_rgb = buffers.get('display_rgb', (480, 640, 3))
+            cv2.cvtColor(display, cv2.COLOR_BGR2RGB, dst=display_rgb)
+            if Image is not None:
+                Image.fromarray(display_rgb)
+
+            detector.get_current_stats()
+            entries = detector.get_history_since(history_seq, config.HISTORY_DISPLAY_LINES)
+            if entries:
+                history_seq = entries[-1].frame_id
+            count_series.append(clock, detector.person_count)
+            if lag is not None:
+                latency_series.append(clock, lag * 1000)
+            cache.publish(detector)
+            if frame_count % 10 == 0:
+                cache.get('snapshot')
+                decimate_minmax(*count_series.arrays(), config.CHART_MAX_POINTS)
+
+            frame_count += 1
+            if frame_count == warmup:
+                monitor.set_baseline()
+            if frame_count > warmup and (frame_count - warmup) % sample_every == 0:
+                report_sample(monitor.sample(frame_count, top), started)
+    except KeyboardInterrupt:
+        print("\n⏹️ Soak stopped by user")
+    finally:
+        # Final sample while the pipeline still holds everything it accumulated
+        if frame_count < warmup:
+            monitor.set_baseline()
+        if not monitor.samples or monitor.samples[-1]['frame'] != frame_count:
+            report_sample(monitor.sample(frame_count, top), started)
+        if pool is not None:
+            pool.shutdown()
+        camera.stop_camera(keep_warm=False)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'source': str(source),
+        'method': config.DETECTION_METHOD,
+        'frames': frame_count,
+        'elapsed': round(elapsed, 2),
+        'fps': round(frame_count / elapsed, 1) if elapsed > 0 else 0.0,
+        'simulated_seconds': round(frame_count / sim_fps, 1) if sim_fps else None,
+        'latency': latency.percentiles(),
+        'samples': monitor.samples,
+    }
+
+
+def report_sample(sample: dict, started: float):
+    traced = f" | traced {_mb(sample['traced_growth'], sign=True)}" if 'traced_growth' in sample else ""
+    print(f"🧪 {sample['frame']:>8} frames | {time.perf_counter() - started:7.1f} s | "
+          f"RSS {_mb(sample['rss'])} ({_mb(sample['rss_growth'], sign=True)}){traced}")
+    for entry in sample.get('top', []):
+        print(f"     +{entry['size_diff'] / 1e3:9.1f} kB  {entry['count_diff']:+7d} objs  {entry['site']}")
+
+
+def check_growth(report: dict, max_growth_mb: float, max_traced_mb: float) -> List[str]:
+    """Threshold violations of the final sample, empty when the run passed"""
+    final = report['samples'][-1]
+    failures = []
+    if final['rss_growth'] is not None and final['rss_growth'] > max_growth_mb * 1e6:
+        failures.append(f"RSS grew {_mb(final['rss_growth'])} (limit {max_growth_mb} MB)")
+    if final.get('traced_growth') is not None and final['traced_growth'] > max_traced_mb * 1e6:
+        failures.append(f"Python heap grew {_mb(final['traced_growth'])} (limit {max_traced_mb} MB)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the detection pipeline at full speed and fail on memory growth')
+    parser.add_argument('--source', '-s', default=config.CAMERA_SOURCE,
+                        help='Any source spec accepted by main.py, e.g. "replay://file.rec?fast&loop"')
+    parser.add_argument('--method', choices=backend_names(), default=config.DETECTION_METHOD)
+    parser.add_argument('--frames', '-n', type=int, default=config.SOAK_FRAMES,
+                        help=f'Frames to process (default: {config.SOAK_FRAMES})')
+    parser.add_argument('--warmup', type=int, default=config.SOAK_WARMUP_FRAMES,
+                        help='Frames before the memory baseline is taken')
+    parser.add_argument('--sample-every', type=int, default=config.SOAK_SAMPLE_FRAMES,
+                        help='Frames between memory samples')
+    parser.add_argument('--sim-fps', type=float, default=config.SOAK_SIMULATED_FPS,
+                        help='Frame rate of the simulated clock (0: use capture timestamps)')
+    parser.add_argument('--max-growth-mb', type=float, default=config.SOAK_MAX_RSS_GROWTH_MB,
+                        help='Fail if RSS grows more than this after warm-up')
+    parser.add_argument('--max-traced-mb', type=float, default=config.SOAK_MAX_TRACED_GROWTH_MB,
+                        help='Fail if the traced Python heap grows more than this after warm-up')
+    parser.add_argument('--top', type=int, default=config.SOAK_TOP_ALLOCATORS,
+                        help='Allocation sites listed per sample')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help='Only sample RSS (tracemalloc slows Python code down noticeably)')
+    parser.add_argument('--workers', '-w', type=int, default=config.DETECTION_WORKERS,
+                        help='Detection worker processes (default: 1, in-process)')
+    parser.add_argument('--report', default=None, help='Write the samples as JSON to this file')
+    args = parser.parse_args()
+
+    if args.source is None:
+        parser.error("--source is required (a soak test should not hold a camera for hours)")
+    config.DETECTION_METHOD = args.method
+    config.DETECTION_WORKERS = args.workers
+
+    print("🧪 Soak Test")
+    print("=" * 40)
+    print(f"📹 Source: {args.source}")
+    print(f"🔍 Detection Method: {config.DETECTION_METHOD}")
+    print(f"🎞️  Frames: {args.frames} (baseline after {args.warmup})")
+    print("=" * 40)
+
+    monitor = MemoryMonitor(trace=not args.no_tracemalloc)
+    try:
+        report = run_soak(args.source, args.frames, args.warmup, max(1, args.sample_every),
+                          args.sim_fps, monitor, args.top)
+    finally:
+        monitor.stop()
+
+    failures = check_growth(report, args.max_growth_mb, args.max_traced_mb)
+    report['passed'] = not failures
+    report['failures'] = failures
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report saved: {args.report}")
+
+    simulated = f", {report['simulated_seconds'] / 3600:.2f} h simulated" if report['simulated_seconds'] else ""
+    print(f"🎞️  {report['frames']} frames in {report['elapsed']} s ({report['fps']} FPS{simulated})")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ No memory growth beyond the limits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Stream Source Check
+===================
+
+Serves frames from a local source (a synthetic scene by default) as an
+MJPEG stream over HTTP on 127.0.0.1, opens that URL through the same
+open_source() path used for IP cameras, and checks that frames arrive and
+that the threaded reader backs off once the server goes away.
+
+Usage:
+    python stream_check.py
+    python stream_check.py --source "replay://captures/lobby.rec?fast&loop" --frames 100
+"""
+
+import argparse
+import sys
+import threading
+import time
+import cv2
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+from frame_sources import open_source
+
+BOUNDARY = b'frame'
+
+
+class MjpegServer:
+    """Minimal multipart/x-mixed-replace MJPEG server, the format most IP cameras offer"""
+
+    def __init__(self, source_spec: str, fps: float = 30.0):
+        self.source = open_source(source_spec, threaded=False)
+        if not self.source.open():
+            raise IOError(f"Cannot open source {source_spec}")
+        self.fps = fps
+        self.lock = threading.Lock()
+        self.running = True
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}")
+                self.end_headers()
+                try:
+                    while server.running:
+                        with server.lock:
+                            ret, frame, _ = server.source.read()
+                        if not ret:
+                            break
+                        data = cv2.imencode('.jpg', frame)[1].tobytes()
+                        self.wfile.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n"
+                                         + f"Content-Length: {len(data)}\r\n\r\n".encode() + data + b"\r\n")
+                        time.sleep(1 / server.fps)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/stream.mjpg"
+
+    def stop(self):
+        self.running = False
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the network stream source path against a local MJPEG server')
+    parser.add_argument('--source', default='synthetic://easy?size=640x360&fast&loop',
+                        help='Frames to serve (any source spec)')
+    parser.add_argument('--frames', type=int, default=60, help='Frames to read through the stream')
+    args = parser.parse_args()
+
+    server = MjpegServer(args.source)
+    print(f"📡 Serving {args.source} at {server.url}")
+    failures = []
+
+    stream = open_source(server.url, 'FFMPEG', threaded=True)
+    if not stream.open():
+        server.stop()
+        print("❌ Cannot open the stream URL (OpenCV built without FFMPEG?)")
+        sys.exit(1)
+    if not stream.is_live:
+        failures.append("URL source not treated as live")
+
+    start = time.perf_counter()
+    received = 0
+    shape = None
+    for _ in range(args.frames):
+        ret, frame, _ = stream.read()
+        if not ret:
+            break
+        received += 1
+        shape = frame.shape
+    elapsed = time.perf_counter() - start
+    print(f"🎞️  {received}/{args.frames} frames in {elapsed:.2f} s ({shape[1]}x{shape[0]})"
+          if received else "🎞️  No frames received")
+    if received < args.frames:
+        failures.append(f"only {received} of {args.frames} frames received")
+
+    # With the server gone the reader must back off instead of spinning
+    server.stop()
+    time.sleep(1)
+    before = time.process_time()
+    time.sleep(2)
+    idle_cpu = time.process_time() - before
+    print(f"⏱️  CPU while the stream is down: {idle_cpu:.2f} s in 2 s")
+    if idle_cpu > 0.5:
+        failures.append(f"decode thread busy while the stream is down ({idle_cpu:.2f} s CPU in 2 s)")
+    stream.close()
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ Stream source OK (retry backoff up to {config.CAPTURE_RETRY_MAX_DELAY} s)")
+
+
+if __name__ == "__main__":
+    main()
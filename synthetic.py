@@ -0,0 +1,217 @@
+import time
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+import config
+from frame_sources import FrameSource, register_source_scheme
+
+# Figure proportions relative to its height
+HEAD_RADIUS = 0.07
+SHOULDER_WIDTH = 0.28
+BODY_WIDTH = 0.36  # Ground-truth box width
+NOISE_BANK = 4  # Precomputed noise fields cycled through frames
+
+
+class SyntheticSource(FrameSource):
+    """Renders moving person-like figures over a static scene, reproducibly from a seed
+
+    Frame n depends only on the seed, the settings and n, so a run can be
+    repeated exactly on any machine. Figures walk back and forth across
+    the scene (occluding each other at higher densities) while the global
+    lighting drifts and sensor noise is added. ground_truth(n) returns the
+    figure boxes of frame n for correctness checks.
+
+    In real-time mode frames are paced at `fps` like a live camera; in fast
+    mode every frame is rendered without waiting. `frames` limits the clip
+    length (None: endless), `loop` restarts from frame 0 at the end.
+    """
+
+    def __init__(self, difficulty: str = None, width: int = None, height: int = None, fps: float = None,
+                 seed: int = None, people: int = None, noise: float = None, lighting: float = None,
+                 frames: Optional[int] = None, realtime: bool = True, loop: bool = False):
+        difficulty = difficulty or config.SYNTHETIC_DIFFICULTY
+        if difficulty not in config.SYNTHETIC_PRESETS:
+            raise ValueError(f"Unknown synthetic difficulty {difficulty!r}, "
+                             f"available: {', '.join(config.SYNTHETIC_PRESETS)}")
+        preset = config.SYNTHETIC_PRESETS[difficulty]
+        default_width, default_height = config.SYNTHETIC_SIZE
+        self.width = width or default_width
+        self.height = height or default_height
+        self.fps = fps or config.SYNTHETIC_FPS
+        self.seed = config.SYNTHETIC_SEED if seed is None else seed
+        self.people = preset['people'] if people is None else people
+        self.noise = preset['noise'] if noise is None else noise
+        self.lighting = preset['lighting'] if lighting is None else lighting
+        self.scale_range = preset['scale']
+        self.speed_range = preset['speed']
+        self.frames = frames
+        self.realtime = realtime
+        self.loop = loop
+        self.is_live = realtime
+        self.name = (f"synthetic {difficulty} {self.width}x{self.height} seed {self.seed}"
+                     + ('' if realtime else ' (fast)'))
+
+        self.background = None
+        self.figures = None
+        self.noise_bank = None
+        self.index = 0
+        self.start_time = None
+        self.frame_index = None  # Index of the last frame read, for ground_truth()
+
+    def open(self) -> bool:
+        rng = np.random.default_rng(self.seed)
+        self.background = self._render_background(rng)
+        self.figures = self._place_figures(rng)
+        self.noise_bank = None
+        if self.noise > 0:
+            # Saturating add/subtract of two uint8 fields is far cheaper than fresh noise per frame
+            shape = (NOISE_BANK, self.height, self.width, 3)
+            self.noise_bank = (np.empty(shape, np.uint8), np.empty(shape, np.uint8))
+            for k in range(NOISE_BANK):
+                field = rng.standard_normal(shape[1:], dtype=np.float32) * self.noise
+                np.clip(field, 0, 255, out=self.noise_bank[0][k], casting='unsafe')
+                np.clip(-field, 0, 255, out=self.noise_bank[1][k], casting='unsafe')
+        self.index = 0
+        self.start_time = None
+        return True
+
+    def _render_background(self, rng: np.random.Generator) -> np.ndarray:
+        """Wall/floor gradient with a few static rectangles (doors, furniture)"""
+        w, h = self.width, self.height
+        base = rng.uniform(90, 170, 3)
+        ramp = np.linspace(1.1, 0.8, h, dtype=np.float32)[:, None, None]
+        background = np.broadcast_to(base.astype(np.float32) * ramp, (h, w, 3))
+        background = np.clip(background, 0, 255).astype(np.uint8)
+        floor = int(h * 0.65)
+        background[floor:] = np.clip(background[floor:].astype(np.int16) - 35, 0, 255).astype(np.uint8)
+        for _ in range(int(rng.integers(3, 7))):
+            x1, y1 = int(rng.uniform(0, w * 0.9)), int(rng.uniform(0, h * 0.6))
+            x2, y2 = x1 + int(rng.uniform(w * 0.05, w * 0.2)), y1 + int(rng.uniform(h * 0.1, h * 0.4))
+            color = tuple(int(c) for c in rng.uniform(40, 220, 3))
+            cv2.rectangle(background, (x1, y1), (x2, y2), color, -1)
+        return background
+
+    def _place_figures(self, rng: np.random.Generator) -> np.ndarray:
+        """Per figure: height, feet y, start x, speed (px/s), leg phase and BGR colour"""
+        n = self.people
+        heights = rng.uniform(*self.scale_range, n) * self.height
+        feet = np.clip(heights + rng.uniform(0.0, 1.0, n) * (self.height - heights), heights, self.height - 1)
+        speeds = rng.uniform(*self.speed_range, n) * rng.choice([-1, 1], n) * (self.width / 1280)
+        return np.column_stack([
+            heights, feet, rng.uniform(0, self.width, n), speeds,
+            rng.uniform(0, 2 * np.pi, n), rng.uniform(10, 90, (n, 3)),
+        ]).astype(np.float64)
+
+    def _positions(self, index: int) -> np.ndarray:
+        """Figure centre x at frame index, bouncing between the scene edges"""
+        t = index / self.fps
+        margin = self.figures[:, 0] * BODY_WIDTH / 2
+        span = np.maximum(self.width - 2 * margin, 1)
+        travel = np.mod(self.figures[:, 2] - margin + self.figures[:, 3] * t, 2 * span)
+        return margin + np.where(travel < span, travel, 2 * span - travel)
+
+    def ground_truth(self, index: Optional[int] = None) -> np.ndarray:
+        """(N, 4) float32 figure boxes of frame `index` (default: the last frame read)"""
+        index = self.frame_index if index is None else index
+        if self.figures is None or index is None or not len(self.figures):
+            return np.zeros((0, 4), dtype=np.float32)
+        heights, feet = self.figures[:, 0], self.figures[:, 1]
+        x = self._positions(index)
+        half = heights * BODY_WIDTH / 2
+        boxes = np.column_stack([x - half, feet - heights, x + half, feet])
+        return np.clip(boxes, 0, [self.width - 1, self.height - 1, self.width - 1, self.height - 1]).astype(np.float32)
+
+    def ground_truth_labels(self, count: int) -> Dict[int, np.ndarray]:
+        """Ground truth of frames 0..count-1 keyed like metrics.load_ground_truth() video labels"""
+        return {i: self.ground_truth(i) for i in range(count)}
+
+    def render(self, index: int) -> np.ndarray:
+        frame = self.background.copy()
+        x = self._positions(index)
+        t = index / self.fps
+        # Draw far (higher up) figures first so nearer ones occlude them
+        for i in np.argsort(self.figures[:, 1]):
+            height, feet, _, speed, phase = self.figures[i, :5]
+            self._draw_figure(frame, x[i], feet, height, t * abs(speed) / max(height, 1) * 4 + phase,
+                              tuple(int(c) for c in self.figures[i, 5:8]))
+
+        if self.lighting > 0:
+            # Slow drift plus a faster flicker, both a function of time only
+            gain = 1.0 + self.lighting * (0.8 * np.sin(2 * np.pi * t / 20) + 0.2 * np.sin(2 * np.pi * t / 1.7))
+            cv2.convertScaleAbs(frame, dst=frame, alpha=gain)
+        if self.noise_bank is not None:
+            k = (index * 2654435761 + self.seed) % NOISE_BANK
+            cv2.add(frame, self.noise_bank[0][k], dst=frame)
+            cv2.subtract(frame, self.noise_bank[1][k], dst=frame)
+        return frame
+
+    @staticmethod
+    def _draw_figure(frame: np.ndarray, x: float, feet: float, height: float, stride: float,
+                     color: Tuple[int, int, int]):
+        """Head, torso, arms and swinging legs of a figure `height` pixels tall standing at (x, feet)"""
+        top = feet - height
+        head_r = max(int(height * HEAD_RADIUS), 2)
+        hip_y = int(top + height * 0.52)
+        neck_y = int(top + 2 * head_r)
+        shoulder = height * SHOULDER_WIDTH / 2
+        limb = max(int(height * 0.06), 2)
+        swing = np.sin(stride) * height * 0.12
+
+        cv2.circle(frame, (int(x), int(top + head_r)), head_r, color, -1)
+        cv2.ellipse(frame, (int(x), (neck_y + hip_y) // 2), (int(shoulder), (hip_y - neck_y) // 2),
+                    0, 0, 360, color, -1)
+        for side in (-1, 1):
+            cv2.line(frame, (int(x + side * shoulder * 0.9), neck_y + limb),
+                     (int(x + side * shoulder + swing * side * 0.5), hip_y), color, limb)
+            cv2.line(frame, (int(x + side * shoulder * 0.35), hip_y),
+                     (int(x + side * (shoulder * 0.35 + swing)), int(feet)), color, int(limb * 1.4))
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        if self.background is None:
+            return False, None, time.time()
+        if self.frames is not None and self.index >= self.frames:
+            if not self.loop:
+                return False, None, time.time()
+            self.index = 0
+            self.start_time = None
+
+        if self.realtime:
+            if self.start_time is None:
+                self.start_time = time.time()
+            delay = self.start_time + self.index / self.fps - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        frame = self.render(self.index)
+        self.frame_index = self.index
+        self.index += 1
+        return True, frame, time.time()
+
+    def close(self):
+        self.background = self.figures = self.noise_bank = None
+
+
+def synthetic_from_spec(spec: str) -> SyntheticSource:
+    """Build a SyntheticSource from "synthetic://[difficulty][?size=WxH&fps=&seed=&people=&noise=&lighting=&frames=&fast&loop]" """
+    difficulty, _, query = spec.split('://', 1)[1].partition('?')
+    options = {key: values[-1] for key, values in parse_qs(query, keep_blank_values=True).items()}
+    try:
+        width = height = None
+        if options.get('size'):
+            width, height = (int(v) for v in options['size'].lower().split('x'))
+        return SyntheticSource(
+            difficulty.strip('/') or None, width, height,
+            fps=float(options['fps']) if options.get('fps') else None,
+            seed=int(options['seed']) if options.get('seed') else None,
+            people=int(options['people']) if options.get('people') else None,
+            noise=float(options['noise']) if options.get('noise') else None,
+            lighting=float(options['lighting']) if options.get('lighting') else None,
+            frames=int(options['frames']) if options.get('frames') else None,
+            realtime='fast' not in options, loop='loop' in options,
+        )
+    except ValueError as e:
+        raise ValueError(f"Invalid synthetic source {spec!r}: {e}")
+
+
+register_source_scheme('synthetic', synthetic_from_spec)
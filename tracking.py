@@ -0,0 +1,128 @@
+import numpy as np
+import config
+from metrics import box_iou
+
+# Constant velocity model on (cx, cy, area, aspect) as in SORT
+_F = np.eye(7, dtype=np.float64)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_H = np.eye(4, 7, dtype=np.float64)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+
+def _boxes_to_z(boxes: np.ndarray) -> np.ndarray:
+    """(N, 4) x1y1x2y2 boxes to (N, 4) centre, area and aspect measurements"""
+    w = boxes[:, 2] - boxes[:, 0]
+    h = np.maximum(boxes[:, 3] - boxes[:, 1], 1e-6)
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w * h, w / h], axis=1)
+
+
+def _x_to_boxes(x: np.ndarray) -> np.ndarray:
+    """Kalman states back to (N, 4) x1y1x2y2 boxes"""
+    area = np.maximum(x[:, 2], 1e-6)
+    w = np.sqrt(area * np.maximum(x[:, 3], 1e-6))
+    h = area / np.maximum(w, 1e-6)
+    return np.stack([x[:, 0] - w / 2, x[:, 1] - h / 2, x[:, 0] + w / 2, x[:, 1] + h / 2], axis=1)
+
+
+class PersonTracker:
+    """SORT-style multi-object tracker assigning stable IDs to detections
+
+    All tracks are kept in stacked arrays, so Kalman prediction, the IoU cost
+    matrix and the correction step are single vectorised NumPy operations
+    regardless of the number of tracks.
+    """
+
+    def __init__(self, iou_threshold: float = None, max_age: int = None, min_hits: int = None):
+        self.iou_threshold = iou_threshold if iou_threshold is not None else config.TRACK_IOU_THRESHOLD
+        self.max_age = max_age if max_age is not None else config.TRACK_MAX_AGE
+        self.min_hits = min_hits if min_hits is not None else config.TRACK_MIN_HITS
+
+        self.x = np.zeros((0, 7))          # Kalman states
+        self.P = np.zeros((0, 7, 7))       # Covariances
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)
+        self.next_id = 1
+        self.unique_persons = 0
+
+    def predict(self) -> np.ndarray:
+        """Advance all tracks one frame, returns predicted boxes"""
+        # Keep the predicted area positive
+        shrinking = (self.x[:, 2] + self.x[:, 6]) <= 0
+        self.x[shrinking, 6] = 0.0
+        self.x = self.x @ _F.T
+        self.P = _F @ self.P @ _F.T + _Q
+        return _x_to_boxes(self.x)
+
+    def match(self, iou: np.ndarray):
+        """Greedy assignment on the IoU cost matrix, returns (det_idx, track_idx) arrays"""
+        if iou.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        order = np.argsort(-iou, axis=None)
+        order = order[iou.ravel()[order] >= self.iou_threshold]
+        rows, cols = np.unravel_index(order, iou.shape)
+        used_rows = np.zeros(iou.shape[0], dtype=bool)
+        used_cols = np.zeros(iou.shape[1], dtype=bool)
+        det_idx, track_idx = [], []
+        for r, c in zip(rows, cols):
+            if used_rows[r] or used_cols[c]:
+                continue
+            used_rows[r] = used_cols[c] = True
+            det_idx.append(r)
+            track_idx.append(c)
+        return np.asarray(det_idx, dtype=np.int64), np.asarray(track_idx, dtype=np.int64)
+
+    def update(self, boxes) -> np.ndarray:
+        """Associate this frame's boxes with tracks, returns one track ID per box"""
+        detections = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        predicted = self.predict()
+        det_idx, track_idx = self.match(box_iou(detections, predicted))
+
+        # Batched Kalman correction of the matched tracks
+        if len(det_idx):
+            x = self.x[track_idx]
+            P = self.P[track_idx]
+            y = _boxes_to_z(detections[det_idx]) - x @ _H.T
+            S = _H @ P @ _H.T + _R
+            K = P @ _H.T @ np.linalg.inv(S)
+            self.x[track_idx] = x + np.einsum('nij,nj->ni', K, y)
+            self.P[track_idx] = (np.eye(7) - K @ _H) @ P
+
+        self.misses += 1
+        self.misses[track_idx] = 0
+        self.hits[track_idx] += 1
+        newly_confirmed = np.count_nonzero(self.hits[track_idx] == self.min_hits)
+
+        # Start tracks for unmatched detections
+        ids = np.zeros(len(detections), dtype=np.int64)
+        ids[det_idx] = self.ids[track_idx]
+        unmatched = np.setdiff1d(np.arange(len(detections)), det_idx)
+        if len(unmatched):
+            new_ids = np.arange(self.next_id, self.next_id + len(unmatched))
+            self.next_id += len(unmatched)
+            new_x = np.zeros((len(unmatched), 7))
+            new_x[:, :4] = _boxes_to_z(detections[unmatched])
+            self.x = np.concatenate([self.x, new_x])
+            self.P = np.concatenate([self.P, np.repeat(_P0[None], len(unmatched), axis=0)])
+            self.ids = np.concatenate([self.ids, new_ids])
+            self.hits = np.concatenate([self.hits, np.ones(len(unmatched), dtype=np.int64)])
+            self.misses = np.concatenate([self.misses, np.zeros(len(unmatched), dtype=np.int64)])
+            ids[unmatched] = new_ids
+            if self.min_hits <= 1:
+                newly_confirmed += len(unmatched)
+        self.unique_persons += newly_confirmed
+
+        # Drop tracks that have not been seen for too long
+        alive = self.misses <= self.max_age
+        if not alive.all():
+            self.x, self.P = self.x[alive], self.P[alive]
+            self.ids, self.hits, self.misses = self.ids[alive], self.hits[alive], self.misses[alive]
+
+        return ids
+
+    def reset(self):
+        """Forget all tracks and restart counting"""
+        self.__init__(self.iou_threshold, self.max_age, self.min_hits)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+HOG Parameter Auto-Tuner
+========================
+
+Sweeps HOG window stride, padding, pyramid scale and inference resolution
+on a reference clip with ground truth, measures FPS and recall for each
+combination and writes the Pareto-optimal settings as a config profile.
+
+Usage:
+    python tuning.py --clip door.mp4 --ground-truth door.jsonl \\
+                     --output profiles/door.json --target-fps 15
+
+The profile is applied with: python main.py --config-profile profiles/door.json
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import time
+import cv2
+from typing import List, Optional
+import config
+from metrics import load_ground_truth, count_matches, pareto_front
+from person_detection import PersonDetector
+
+# Config names written to (and restored from) a profile
+PROFILE_KEYS = ('HOG_WIN_STRIDE', 'HOG_PADDING', 'HOG_SCALE', 'INFERENCE_SCALE')
+
+
+def load_profile(path: str) -> dict:
+    """Apply the settings of a tuned profile to the config module"""
+    with open(path, 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+
+    for key, value in profile.get('settings', {}).items():
+        if key not in PROFILE_KEYS:
+            continue
+        setattr(config, key, tuple(value) if isinstance(value, list) else value)
+
+    print(f"✓ Config profile loaded: {profile.get('name', path)}")
+    return profile
+
+
+def read_clip(path: str, max_frames: Optional[int] = None) -> List:
+    """Read the frames of a reference clip into memory"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open clip {path}")
+
+    frames = []
+    while max_frames is None or len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def evaluate_settings(detector: PersonDetector, frames: List, ground_truth: dict,
+                      iou_threshold: float) -> dict:
+    """Run the detector over all frames and measure FPS, recall and precision"""
+    tp = fp = fn = 0
+    elapsed = 0.0
+
+    for index, frame in enumerate(frames):
+        start = time.perf_counter()
+        result = detector.detect_boxes(frame)
+        elapsed += time.perf_counter() - start
+
+        if index not in ground_truth:
+            continue
+        # Greedy matching expects detections in descending confidence order
+        boxes = result.sorted_by_score().boxes
+        frame_tp, frame_fp, frame_fn = count_matches(boxes, ground_truth[index], iou_threshold)
+        tp += frame_tp
+        fp += frame_fp
+        fn += frame_fn
+
+    return {
+        'fps': round(len(frames) / elapsed, 2) if elapsed > 0 else 0.0,
+        'recall': round(tp / (tp + fn), 4) if tp + fn else 0.0,
+        'precision': round(tp / (tp + fp), 4) if tp + fp else 0.0,
+    }
+
+
+def sweep(frames: List, ground_truth: dict, iou_threshold: float) -> List[dict]:
+    """Evaluate every combination of the configured search space"""
+    detector = PersonDetector(method="HOG")
+    grid = list(itertools.product(config.TUNE_WIN_STRIDES, config.TUNE_PADDINGS,
+                                  config.TUNE_HOG_SCALES, config.TUNE_INFERENCE_SCALES))
+    results = []
+
+    for i, (stride, padding, hog_scale, inference_scale) in enumerate(grid, 1):
+        detector.hog_win_stride = tuple(stride)
+        detector.hog_padding = tuple(padding)
+        detector.hog_scale = hog_scale
+        detector.inference_scale = inference_scale
+
+        measured = evaluate_settings(detector, frames, ground_truth, iou_threshold)
+        settings = {
+            'HOG_WIN_STRIDE': list(stride),
+            'HOG_PADDING': list(padding),
+            'HOG_SCALE': hog_scale,
+            'INFERENCE_SCALE': inference_scale,
+        }
+        results.append({'settings': settings, **measured})
+        print(f"[{i}/{len(grid)}] stride={stride} padding={padding} scale={hog_scale} "
+              f"res={inference_scale} -> {measured['fps']} FPS, recall {measured['recall']}")
+
+    return results
+
+
+def select_profile(front: List[dict], target_fps: Optional[float], min_recall: float) -> dict:
+    """Pick the fastest acceptable configuration from the Pareto front
+
+    Acceptable means recall >= min_recall and, when given, FPS >= target_fps.
+    If nothing qualifies, the most accurate configuration is returned.
+    """
+    acceptable = [r for r in front if r['recall'] >= min_recall]
+    if target_fps is not None:
+        acceptable = [r for r in acceptable if r['fps'] >= target_fps]
+    if acceptable:
+        return max(acceptable, key=lambda r: r['fps'])
+    return max(front, key=lambda r: r['recall'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Auto-tune HOG parameters on a reference clip')
+    parser.add_argument('--clip', required=True, help='Reference video clip')
+    parser.add_argument('--ground-truth', required=True,
+                        help='Ground truth JSON Lines file ({"frame": i, "boxes": [...]})')
+    parser.add_argument('--output', '-o', required=True, help='Profile JSON file to write')
+    parser.add_argument('--name', help='Profile name (default: output file name)')
+    parser.add_argument('--target-fps', type=float, default=None,
+                        help='Minimum acceptable detection FPS')
+    parser.add_argument('--min-recall', type=float, default=config.TUNE_MIN_RECALL,
+                        help=f'Minimum acceptable recall (default: {config.TUNE_MIN_RECALL})')
+    parser.add_argument('--max-frames', type=int, default=300,
+                        help='Maximum number of clip frames to evaluate (default: 300)')
+    args = parser.parse_args()
+
+    print("🎛️  HOG Parameter Auto-Tuner")
+    print("=" * 40)
+    frames = read_clip(args.clip, args.max_frames)
+    ground_truth = load_ground_truth(args.ground_truth)
+    print(f"📹 {len(frames)} frames, {len(ground_truth)} labelled")
+
+    results = sweep(frames, ground_truth, config.TUNE_IOU_THRESHOLD)
+    front = [results[i] for i in pareto_front([(r['fps'], r['recall']) for r in results])]
+    front.sort(key=lambda r: r['fps'])
+    chosen = select_profile(front, args.target_fps, args.min_recall)
+
+    profile = {
+        'name': args.name or os.path.splitext(os.path.basename(args.output))[0],
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'clip': args.clip,
+        'settings': chosen['settings'],
+        'measured': {k: chosen[k] for k in ('fps', 'recall', 'precision')},
+        'pareto_front': front,
+    }
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+
+    print("=" * 40)
+    print(f"🏁 Pareto front: {len(front)} of {len(results)} configurations")
+    print(f"✅ Selected {chosen['settings']} "
+          f"({chosen['fps']} FPS, recall {chosen['recall']})")
+    print(f"💾 Profile saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
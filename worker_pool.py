@@ -0,0 +1,222 @@
+import multiprocessing as mp
+import queue
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+import config
+from detection_result import DetectionResult
+
+
+def _detection_worker(method: str, settings: dict, tasks: mp.Queue, results: mp.Queue):
+    """Worker process: run detection on frames placed in shared memory slots"""
+    from detection_result import DetectionResult
+    from person_detection import PersonDetector
+
+    detector = PersonDetector(method=method)
+    for name, value in settings.items():
+        setattr(detector, name, value)
+
+    slots = {}  # slot index -> attached SharedMemory (replaced when the parent grows a slot)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            frame_id, slot, name, shape = task
+            if slot not in slots or slots[slot].name != name:
+                if slot in slots:
+                    slots[slot].close()
+                slots[slot] = shared_memory.SharedMemory(name=name)
+            # View straight into the shared buffer, no copy
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=slots[slot].buf)
+            try:
+                result = detector.detect_boxes(frame)
+            except Exception as e:
+                print(f"Worker detection error: {e}")
+                result = DetectionResult()
+            del frame
+            results.put((frame_id, slot, result))
+    finally:
+        for shm in slots.values():
+            shm.close()
+
+
+class SharedMemoryDetectorPool:
+    """Runs detection in worker processes on frames shared through shared memory
+
+    Each frame is copied once into a free shared memory slot; workers read it
+    in place and only send back the (small) DetectionResult. Results are returned by
+    ``get_result()`` strictly in submission order, and the slot of a returned
+    frame stays valid until the next call to ``get_result()``.
+
+    A slot is reallocated when a larger frame arrives (image folders with
+    mixed sizes). If a worker dies or no result arrives within
+    WORKER_RESULT_TIMEOUT seconds, the remaining workers are stopped and
+    pending and later frames are detected in-process with the parent's
+    detector, so callers never hang.
+    """
+
+    def __init__(self, detector, workers: int = None, slots: int = None):
+        self.detector = detector
+        self.method = detector.method
+        self.settings = {
+            'hog_win_stride': detector.hog_win_stride,
+            'hog_padding': detector.hog_padding,
+            'hog_scale': detector.hog_scale,
+            'inference_scale': detector.inference_scale,
+        }
+        self.num_workers = workers or config.DETECTION_WORKERS
+        self.num_slots = slots or max(config.SHARED_MEMORY_SLOTS, self.num_workers + 1)
+
+        self.context = mp.get_context('spawn')
+        self.tasks = self.context.Queue()
+        self.results = self.context.Queue()
+        self.workers = []
+        self.slots = []
+        self.fallback = False  # Workers failed, detect in-process
+
+        self.free_slots = []
+        self.next_submit_id = 0
+        self.next_result_id = 0
+        self.reorder_buffer = {}
+        self.frame_info = {}  # frame id -> (slot, shape, capture timestamp)
+        self.held_slot = None
+
+    def start(self, frame_shape: Tuple[int, ...]):
+        """Allocate shared memory slots sized for frame_shape and spawn the workers"""
+        slot_bytes = int(np.prod(frame_shape))
+        self.slots = [shared_memory.SharedMemory(create=True, size=slot_bytes)
+                      for _ in range(self.num_slots)]
+        self.free_slots = list(range(self.num_slots))
+
+        for _ in range(self.num_workers):
+            worker = self.context.Process(
+                target=_detection_worker,
+                args=(self.method, self.settings, self.tasks, self.results),
+                daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        print(f"✓ Detection worker pool started ({self.num_workers} workers, {self.num_slots} slots)")
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted frames whose result has not been returned yet"""
+        return self.next_submit_id - self.next_result_id
+
+    def has_free_slot(self) -> bool:
+        return not self.slots or bool(self.free_slots)
+
+    def submit(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Copy a frame into a free slot and queue it for detection, returns its frame id"""
+        if not self.slots:
+            self.start(frame.shape)
+        if frame.dtype != np.uint8:
+            raise ValueError(f"Frame dtype {frame.dtype} is not supported, expected uint8")
+
+        slot = self.free_slots.pop()
+        if frame.nbytes > self.slots[slot].size:
+            # Free slots are not in use by any worker, so the buffer can be replaced
+            self.slots[slot].close()
+            self.slots[slot].unlink()
+            self.slots[slot] = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.slots[slot].buf)
+        np.copyto(view, frame)
+
+        frame_id = self.next_submit_id
+        self.next_submit_id += 1
+        self.frame_info[frame_id] = (slot, frame.shape, timestamp)
+        if not self.fallback:
+            self.tasks.put((frame_id, slot, self.slots[slot].name, frame.shape))
+        return frame_id
+
+    def get_result(self, timeout: Optional[float] = None) -> Tuple[int, np.ndarray, DetectionResult]:
+        """Return (frame_id, frame, result) for the oldest submitted frame
+
+        The result carries the capture timestamp given to submit() when there was one.
+        If the workers fail (see class docstring) the frame is detected in-process.
+        """
+        self._release_held_slot()
+
+        frame_id = self.next_result_id
+        limit = timeout if timeout is not None else config.WORKER_RESULT_TIMEOUT
+        deadline = time.monotonic() + limit
+        while frame_id not in self.reorder_buffer and not self.fallback:
+            try:
+                result_id, slot, result = self.results.get(
+                    timeout=max(0.0, min(config.WORKER_POLL_INTERVAL, deadline - time.monotonic())))
+                self.reorder_buffer[result_id] = (slot, result)
+            except queue.Empty:
+                dead = [worker for worker in self.workers if not worker.is_alive()]
+                if dead:
+                    self._fail(f"worker exited with code {dead[0].exitcode}")
+                elif time.monotonic() >= deadline:
+                    self._fail(f"no result within {limit:.0f} s")
+
+        slot, shape, timestamp = self.frame_info.pop(frame_id)
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=self.slots[slot].buf)
+        if frame_id in self.reorder_buffer:
+            _, result = self.reorder_buffer.pop(frame_id)
+        else:
+            result = self.detector.detect_boxes(frame)
+        self.next_result_id += 1
+        self.held_slot = slot
+        if timestamp is not None:
+            result = result.with_frame(result.frame_id, timestamp)
+        return frame_id, frame, result
+
+    def process(self, read_frame: Callable) -> Tuple[bool, Optional[np.ndarray], Optional[DetectionResult]]:
+        """Keep all slots busy with frames from read_frame(), then return the next ordered result
+
+        read_frame() returns (ret, frame, capture_timestamp), e.g.
+        CameraManager.read_frame_timestamped.
+        """
+        if self.fallback and self.pending == 0:
+            ret, frame, timestamp = read_frame()
+            if not ret:
+                return False, None, None
+            return True, frame, self.detector.detect_boxes(frame).with_frame(0, timestamp)
+
+        ret = True
+        while not self.fallback and self.has_free_slot() and self.pending < self.num_slots:
+            ret, frame, timestamp = read_frame()
+            if not ret:
+                break
+            self.submit(frame, timestamp)
+
+        if self.pending == 0:
+            return False, None, None
+        _, frame, result = self.get_result()
+        return True, frame, result
+
+    def _fail(self, reason: str):
+        """Stop using the workers after a failure, pending frames are detected in-process"""
+        print(f"⚠ Detection workers failed ({reason}), continuing with in-process detection")
+        self.fallback = True
+        self._stop_workers(timeout=0.5)
+
+    def _stop_workers(self, timeout: float = 2):
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+
+    def _release_held_slot(self):
+        if self.held_slot is not None:
+            self.free_slots.append(self.held_slot)
+            self.held_slot = None
+
+    def shutdown(self):
+        """Stop the workers and free the shared memory"""
+        self._stop_workers()
+
+        for shm in self.slots:
+            shm.close()
+            shm.unlink()
+        self.slots = []
+        self.free_slots = []
+        print("✓ Detection worker pool stopped")